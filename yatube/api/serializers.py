@@ -0,0 +1,29 @@
+from posts.models import Post
+
+POST_FIELDS = (
+    "id",
+    "text",
+    "pub_date",
+    "author__username",
+    "group__slug",
+    "image",
+    "comment_count",
+)
+
+
+def post_fields(prefix=""):
+    return tuple(prefix + field for field in POST_FIELDS)
+
+
+def serialize_post(row, prefix=""):
+    image = row[prefix + "image"]
+    storage = Post._meta.get_field("image").storage
+    return {
+        "id": row[prefix + "id"],
+        "text": row[prefix + "text"],
+        "pub_date": row[prefix + "pub_date"].isoformat(),
+        "author": row[prefix + "author__username"],
+        "group": row[prefix + "group__slug"],
+        "image": storage.url(image) if image else None,
+        "comments": row[prefix + "comment_count"],
+    }
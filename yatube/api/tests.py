@@ -0,0 +1,92 @@
+from http import HTTPStatus as ht
+
+from django.conf import settings as st
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="api_author")
+        cls.reader = User.objects.create(username="api_reader")
+        cls.group = Group.objects.create(
+            title="Api group",
+            slug="api_group",
+            description="Api group",
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for i in range(st.POST_LIMIT + 2):
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f"Пост {i}"
+            )
+        cls.post = Post.objects.latest("pub_date")
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_feeds_paginate_by_cursor(self):
+        expected = list(
+            Post.objects.order_by("-pub_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        urls = (
+            reverse("api:index"),
+            reverse("api:group_list", kwargs={"slug": self.group.slug}),
+            reverse("api:profile", kwargs={"username": self.author}),
+            reverse("api:follow_index"),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.client.get(url).json()
+                self.assertEqual(len(first["results"]), st.POST_LIMIT)
+                self.assertIsNone(first["previous"])
+                second = self.client.get(
+                    url, {"cursor": first["next"]}
+                ).json()
+                ids = [row["id"] for row in
+                       first["results"] + second["results"]]
+                self.assertEqual(ids, expected)
+                self.assertIsNone(second["next"])
+                self.assertEqual(first["results"][0]["author"],
+                                 self.author.username)
+                self.assertEqual(first["results"][0]["group"],
+                                 self.group.slug)
+
+    def test_post_detail(self):
+        response = self.client.get(
+            reverse("api:post_detail", kwargs={"post_id": self.post.pk})
+        )
+        self.assertEqual(response.json()["text"], self.post.text)
+        missing = self.client.get(
+            reverse("api:post_detail", kwargs={"post_id": 0})
+        )
+        self.assertEqual(missing.status_code, ht.NOT_FOUND)
+
+    def test_follow_requires_login(self):
+        response = Client().get(reverse("api:follow_index"))
+        self.assertEqual(response.status_code, ht.UNAUTHORIZED)
+
+    def test_etag_not_modified(self):
+        url = reverse("api:post_detail", kwargs={"post_id": self.post.pk})
+        etag = self.client.get(url)["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, ht.NOT_MODIFIED)
+        Comment.objects.create(
+            post=self.post, author=self.reader, text="Новый"
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, ht.OK)
+        self.assertEqual(response.json()["comments"], 1)
@@ -0,0 +1,124 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_GET
+
+from posts import cache_versions as versions
+from posts.models import Group, Post, TimelineEntry, User
+from posts.utils import CURSOR_PARAM, cursor_return_page
+
+from .serializers import post_fields, serialize_post
+
+JSON_PARAMS = {"ensure_ascii": False, "separators": (",", ":")}
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params=JSON_PARAMS)
+
+
+def make_etag(queryset, version, request):
+    stats = queryset.aggregate(newest=Max("pub_date"), total=Count("id"))
+    newest = stats["newest"].isoformat() if stats["newest"] else ""
+    source = ":".join((
+        newest,
+        str(stats["total"]),
+        version,
+        request.GET.get(CURSOR_PARAM, ""),
+    ))
+    return hashlib.sha1(source.encode()).hexdigest()
+
+
+def feed_response(request, queryset, prefix=""):
+    fields = post_fields(prefix)
+    if prefix:
+        fields = ("id", "pub_date", *fields)
+    page = cursor_return_page(queryset.values(*fields), request)
+    return json_response({
+        "results": [serialize_post(row, prefix) for row in page],
+        "next": page.next_cursor,
+        "previous": page.previous_cursor,
+    })
+
+
+def index_etag(request):
+    return make_etag(
+        Post.objects.all(), versions.get_version(versions.FEED), request
+    )
+
+
+@require_GET
+@condition(etag_func=index_etag)
+def index(request):
+    return feed_response(request, Post.objects.all())
+
+
+def group_etag(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return make_etag(
+        group.posts.all(),
+        versions.get_version(versions.GROUP, group.pk),
+        request,
+    )
+
+
+@require_GET
+@condition(etag_func=group_etag)
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(request, group.posts.all())
+
+
+def profile_etag(request, username):
+    author = get_object_or_404(User, username=username)
+    return make_etag(
+        author.posts.all(),
+        versions.get_version(versions.AUTHOR, author.pk),
+        request,
+    )
+
+
+@require_GET
+@condition(etag_func=profile_etag)
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    return feed_response(request, author.posts.all())
+
+
+def post_etag(request, post_id):
+    return make_etag(
+        Post.objects.filter(pk=post_id),
+        versions.get_version(versions.POST, post_id),
+        request,
+    )
+
+
+@require_GET
+@condition(etag_func=post_etag)
+def post_detail(request, post_id):
+    row = get_object_or_404(
+        Post.objects.values(*post_fields()), pk=post_id
+    )
+    return json_response(serialize_post(row))
+
+
+def follow_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    return make_etag(
+        TimelineEntry.objects.filter(user=request.user),
+        versions.get_version(versions.FOLLOW, request.user.pk),
+        request,
+    )
+
+
+@require_GET
+@condition(etag_func=follow_etag)
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return json_response(
+            {"detail": "Требуется авторизация"}, status=401
+        )
+    entries = TimelineEntry.objects.filter(user=request.user)
+    return feed_response(request, entries, prefix="post__")
@@ -0,0 +1,14 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite, в котором atomic() сразу берёт блокировку на запись.
+
+    Django начинает транзакцию отложенным BEGIN, а представления сначала
+    читают, потом пишут. Повышение блокировки чтения до записи SQLite
+    не ждёт: при занятой базе сразу "database is locked", и busy_timeout
+    не помогает. BEGIN IMMEDIATE ждёт блокировку в начале транзакции.
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE")
@@ -0,0 +1,5 @@
+from django.conf import settings
+
+
+def fragment_ttl(request):
+    return {"fragment_ttl": settings.FRAGMENT_CACHE_TTL}
@@ -0,0 +1,8 @@
+from django.conf import settings
+
+from .sqlite import apply_pragmas
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor == "sqlite" and settings.SQLITE_PRAGMAS:
+        apply_pragmas(connection.connection, settings.SQLITE_PRAGMAS)
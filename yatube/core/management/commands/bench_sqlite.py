@@ -0,0 +1,57 @@
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.sqlite import create_schema, run_worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность SQLite с настройками по "
+        "умолчанию и с SQLITE_PRAGMAS при параллельных чтениях и записях "
+        "из нескольких процессов; deferred - SQLITE_PRAGMAS с обычным "
+        "BEGIN, при котором запись после чтения не ждёт блокировку"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=8)
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--write-ratio", type=float, default=0.2)
+        parser.add_argument("--posts", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp()
+        try:
+            report = {
+                name: self.run(directory, name, pragmas, begin, options)
+                for name, pragmas, begin in (
+                    ("default", {}, "BEGIN"),
+                    ("deferred", settings.SQLITE_PRAGMAS, "BEGIN"),
+                    ("tuned", settings.SQLITE_PRAGMAS, "BEGIN IMMEDIATE"),
+                )
+            }
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run(self, directory, name, pragmas, begin, options):
+        path = os.path.join(directory, f"{name}.sqlite3")
+        create_schema(path, options["posts"])
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(options["processes"]) as pool:
+            results = pool.starmap(run_worker, [
+                (path, pragmas, begin, options["seconds"],
+                 options["write_ratio"], seed)
+                for seed in range(options["processes"])
+            ])
+        reads, writes, locked = map(sum, zip(*results))
+        return {
+            "reads_per_second": round(reads / options["seconds"], 1),
+            "writes_per_second": round(writes / options["seconds"], 1),
+            "locked_errors": locked,
+        }
@@ -0,0 +1,44 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .profiling import RequestMetrics, current, sql_wrapper
+
+logger = logging.getLogger("yatube.profiling")
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sampled = random.random() < settings.PROFILING_SAMPLE_RATE
+        if not (settings.SERVER_TIMING or sampled):
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        if settings.SERVER_TIMING:
+            response["Server-Timing"] = metrics.server_timing()
+        if sampled:
+            match = request.resolver_match
+            logger.info(json.dumps({
+                "method": request.method,
+                "path": request.path,
+                "view": match.view_name if match else None,
+                "status": response.status_code,
+                **metrics.as_dict(),
+            }))
+        return response
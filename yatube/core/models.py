@@ -6,6 +6,17 @@ class CreatedModel(models.Model):
         'Дата создания',
         auto_now_add=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         abstract = True
+
+
+class WriteStamp(models.Model):
+    stamp = models.BigIntegerField("Метка последней записи", default=0)
+
+    class Meta:
+        verbose_name = "Метка записи в основную базу"
@@ -0,0 +1,73 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        return ", ".join((
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.sql_count} SQL"',
+            f"tpl;dur={self.template_time * 1000:.1f}",
+            f'cache;desc="hit={self.cache_hits} miss={self.cache_misses}"',
+            f"total;dur={self.total_time * 1000:.1f}",
+        ))
+
+    def as_dict(self):
+        return {
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_time * 1000, 3),
+            "template_ms": round(self.template_time * 1000, 3),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "total_ms": round(self.total_time * 1000, 3),
+        }
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    metrics = current.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if metrics is not None:
+            metrics.sql_count += 1
+            metrics.sql_time += time.perf_counter() - started
+
+
+@contextmanager
+def timed_template():
+    # Карточки рендерятся внутри шаблона страницы: считается только
+    # внешний рендер, иначе их время вошло бы в tpl дважды.
+    metrics = current.get()
+    if metrics is None or metrics.template_depth:
+        yield
+        return
+    metrics.template_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.template_depth -= 1
+        metrics.template_time += time.perf_counter() - started
+
+
+def record_cache(hits, misses):
+    metrics = current.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
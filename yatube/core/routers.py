@@ -0,0 +1,134 @@
+import random
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_SESSION_KEY = "_pin_primary"
+# Метка хранится рядом с версиями кеша, в общем для процессов кеше.
+STAMP_CACHE = "versions"
+STAMP_KEY = "replica:write_stamp"
+
+_replica = ContextVar("replica", default=None)
+
+
+class ReplicaRead:
+    # Общий объект, а не значение в ContextVar: переключение на основную
+    # базу должно быть видно и в потоках concurrent.gather.
+    def __init__(self, alias, stamp):
+        self.alias = alias
+        self.stamp = stamp
+        self.fell_back = False
+
+
+class ReplicaRouter:
+    """Чтение в представлениях с read_from_replica идёт с реплик.
+
+    Запись и чтение внутри транзакций всегда идут в основную базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        read = _replica.get()
+        if read is None or read.alias is None:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return read.alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.REPLICA_DATABASES
+
+
+def record_write():
+    """Отмечает запись в основной базе для проверки отставания реплик.
+
+    Вызывается вместе со сбросом версий кеша: реплика, которая ещё
+    не получила метку, могла бы закешировать старые данные под новой
+    версией.
+    """
+    if not settings.REPLICA_DATABASES:
+        return
+    from .models import WriteStamp
+
+    stamp = time.time_ns()
+    WriteStamp.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        pk=1, defaults={"stamp": stamp}
+    )
+    # Метку откатившейся транзакции реплика не догонит, и чтение уйдёт
+    # в основную базу до следующей записи - это безопасно.
+    caches[STAMP_CACHE].set(STAMP_KEY, stamp, None)
+
+
+def _expected_stamp():
+    return caches[STAMP_CACHE].get(STAMP_KEY)
+
+
+def _is_current(alias, expected):
+    if expected is None:
+        return True
+    from .models import WriteStamp
+
+    stamp = WriteStamp.objects.using(alias).filter(pk=1).values_list(
+        "stamp", flat=True
+    ).first()
+    return stamp is not None and stamp >= expected
+
+
+def confirm_replica():
+    """Проверяет реплику после чтения версий кеша.
+
+    Если с начала запроса была запись, а реплика её ещё не получила,
+    остаток запроса читает основную базу: иначе старые данные попали бы
+    в кеш под новой версией.
+    """
+    read = _replica.get()
+    if read is None or read.alias is None:
+        return
+    expected = _expected_stamp()
+    if expected == read.stamp:
+        return
+    if _is_current(read.alias, expected):
+        read.stamp = expected
+    else:
+        read.alias = None
+        read.fell_back = True
+
+
+def read_from_replica(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        # Пользователь и сессия читаются из основной базы: реплика может
+        # ещё не знать о только что зарегистрированном пользователе.
+        request.user.is_authenticated
+        if not settings.REPLICA_DATABASES or request.session.get(
+            PIN_SESSION_KEY
+        ):
+            return view(request, *args, **kwargs)
+        replica = random.choice(settings.REPLICA_DATABASES)
+        expected = _expected_stamp()
+        if not _is_current(replica, expected):
+            return view(request, *args, **kwargs)
+        read = ReplicaRead(replica, expected)
+        token = _replica.set(read)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica.reset(token)
+            # Часть ответа могла быть прочитана с реплики до переключения.
+            request.replica_fell_back = read.fell_back
+    return wrapper
+
+
+def pin_primary(request):
+    """После записи сессия читает только из основной базы."""
+    if settings.REPLICA_DATABASES:
+        request.session[PIN_SESSION_KEY] = True
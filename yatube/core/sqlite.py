@@ -0,0 +1,85 @@
+import random
+import sqlite3
+import time
+
+# Модуль выполняется и в дочерних процессах бенчмарка, поэтому не
+# импортирует Django.
+
+
+def apply_pragmas(connection, pragmas):
+    cursor = connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def create_schema(path, posts):
+    with sqlite3.connect(path) as connection:
+        connection.executescript("""
+            CREATE TABLE post (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text TEXT NOT NULL,
+                pub_date REAL NOT NULL,
+                comment_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX post_pub_date ON post (pub_date);
+            CREATE TABLE comment (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                post_id INTEGER NOT NULL REFERENCES post (id),
+                text TEXT NOT NULL,
+                created REAL NOT NULL
+            );
+            CREATE INDEX comment_post_created ON comment (post_id, created);
+        """)
+        connection.executemany(
+            "INSERT INTO post (text, pub_date) VALUES (?, ?)",
+            (("x" * 400, time.time() - i) for i in range(posts)),
+        )
+
+
+def run_worker(path, pragmas, begin, seconds, write_ratio, seed):
+    """Смешанная нагрузка одного процесса: (чтений, записей, блокировок).
+
+    Запись устроена как в представлениях: транзакция сначала читает
+    строку поста и только потом пишет.
+    """
+    rng = random.Random(seed)
+    connection = sqlite3.connect(path, isolation_level=None)
+    apply_pragmas(connection, pragmas)
+    (posts,) = connection.execute("SELECT MAX(id) FROM post").fetchone()
+    reads = writes = locked = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            if rng.random() < write_ratio:
+                post_id = rng.randint(1, posts)
+                connection.execute(begin)
+                connection.execute(
+                    "SELECT id, comment_count FROM post WHERE id = ?",
+                    (post_id,),
+                ).fetchone()
+                connection.execute(
+                    "INSERT INTO comment (post_id, text, created) "
+                    "VALUES (?, ?, ?)", (post_id, "comment", time.time()),
+                )
+                connection.execute(
+                    "UPDATE post SET comment_count = comment_count + 1 "
+                    "WHERE id = ?", (post_id,),
+                )
+                connection.execute("COMMIT")
+                writes += 1
+            else:
+                connection.execute(
+                    "SELECT id, text, pub_date, comment_count FROM post "
+                    "ORDER BY pub_date DESC LIMIT 10 OFFSET ?",
+                    (rng.randint(0, 100),),
+                ).fetchall()
+                reads += 1
+        except sqlite3.OperationalError:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            locked += 1
+    connection.close()
+    return reads, writes, locked
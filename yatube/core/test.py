@@ -1,5 +1,13 @@
+import json
 from http import HTTPStatus as ht
-from django.test import TestCase
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import profiling
 
 
 class ViewTestClass(TestCase):
@@ -7,3 +15,64 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, ht.NOT_FOUND)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class ServerTimingTestClass(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing_header(self):
+        response = self.client.get('/')
+        timing = response['Server-Timing']
+        for metric in ('db;', 'tpl;', 'cache;', 'total;'):
+            self.assertIn(metric, timing)
+
+    @override_settings(SERVER_TIMING=False, PROFILING_SAMPLE_RATE=0.0)
+    def test_disabled(self):
+        response = self.client.get('/')
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(SERVER_TIMING=False, PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_log(self):
+        with self.assertLogs('yatube.profiling', level='INFO') as logs:
+            self.client.get('/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'posts:index')
+        self.assertEqual(record['status'], ht.OK)
+        self.assertGreater(record['sql_count'], 0)
+
+
+class TemplateTimingTestClass(TestCase):
+    def test_nested_render_counted_once(self):
+        metrics = profiling.RequestMetrics()
+        token = profiling.current.set(metrics)
+        try:
+            with mock.patch('core.profiling.time.perf_counter',
+                            side_effect=[0.0, 3.0]):
+                with profiling.timed_template():
+                    with profiling.timed_template():
+                        pass
+        finally:
+            profiling.current.reset(token)
+        self.assertEqual(metrics.template_time, 3.0)
+        self.assertEqual(metrics.template_depth, 0)
+
+
+class SqlitePragmasTestClass(TestCase):
+    def test_pragmas_applied(self):
+        expected = {'busy_timeout': 5000, 'cache_size': -20000,
+                    'synchronous': 1}
+        with connection.cursor() as cursor:
+            for name, value in expected.items():
+                with self.subTest(pragma=name):
+                    cursor.execute(f'PRAGMA {name}')
+                    self.assertEqual(cursor.fetchone()[0], value)
+
+
+class SqliteImmediateTestClass(TransactionTestCase):
+    def test_atomic_takes_write_lock(self):
+        with CaptureQueriesContext(connection) as context:
+            with transaction.atomic():
+                pass
+        self.assertEqual(context.captured_queries[0]['sql'],
+                         'BEGIN IMMEDIATE')
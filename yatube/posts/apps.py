@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = "posts"
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from . import signals
+
+        post_migrate.connect(signals.create_search_index, sender=self)
+        post_migrate.connect(signals.reset_follower_graph, sender=self)
@@ -0,0 +1,107 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache import caches
+from django.db import transaction
+
+from core import routers
+
+from .models import Follow, Group, Post, User
+
+FEED = "feed"
+GROUP = "group"
+AUTHOR = "author"
+POST = "post"
+FOLLOW = "follow"
+HOT = "hot"
+
+CACHE_ALIAS = "versions"
+
+_observed = ContextVar("observed_versions", default=None)
+
+
+def version_key(scope, pk=None):
+    if pk is None:
+        return f"version:{scope}"
+    return f"version:{scope}:{pk}"
+
+
+def get_versions(*keys):
+    versions = caches[CACHE_ALIAS].get_many(keys)
+    missing = {
+        key: time.time_ns() for key in keys if key not in versions
+    }
+    if missing:
+        caches[CACHE_ALIAS].set_many(missing, None)
+        versions.update(missing)
+    routers.confirm_replica()
+    observed = _observed.get()
+    if observed is not None:
+        observed.update((key, versions[key]) for key in keys)
+    return "-".join(str(versions[key]) for key in keys)
+
+
+@contextmanager
+def observe():
+    """Собирает версии, прочитанные внутри блока: от них зависит ответ."""
+    observed = {}
+    token = _observed.set(observed)
+    try:
+        yield observed
+    finally:
+        _observed.reset(token)
+
+
+def unchanged(observed):
+    """Совпадают ли версии, собранные observe(), с текущими."""
+    return caches[CACHE_ALIAS].get_many(observed.keys()) == observed
+
+
+def get_version(scope, pk=None):
+    return get_versions(version_key(scope, pk))
+
+
+def bump(*keys):
+    # Удалённая версия пересоздаётся при следующем чтении новым значением,
+    # поэтому старые фрагменты перестают совпадать по ключу.
+    # Метка записи ставится раньше сброса: кто увидит новую версию,
+    # увидит и новую метку.
+    routers.record_write()
+    caches[CACHE_ALIAS].delete_many(keys)
+    if transaction.get_connection().in_atomic_block:
+        # До фиксации параллельный запрос пересоздаст версию, прочитает
+        # старые строки и сохранит их под ней. Повторный сброс после
+        # фиксации делает такую версию недействительной.
+        transaction.on_commit(
+            lambda: caches[CACHE_ALIAS].delete_many(keys)
+        )
+
+
+def bump_post(post, *group_ids):
+    followers = Follow.objects.filter(author_id=post.author_id).values_list(
+        "user_id", flat=True
+    )
+    bump(
+        version_key(FEED),
+        version_key(AUTHOR, post.author_id),
+        version_key(POST, post.pk),
+        *(version_key(GROUP, group_id)
+          for group_id in {post.group_id, *group_ids} if group_id),
+        *(version_key(FOLLOW, user_id) for user_id in followers),
+    )
+
+
+def bump_all():
+    """Сбрасывает версии всех объектов после записи в обход сигналов."""
+    user_ids = list(User.objects.values_list("pk", flat=True))
+    bump(
+        version_key(FEED),
+        version_key(HOT),
+        *(version_key(GROUP, pk)
+          for pk in Group.objects.values_list("pk", flat=True)),
+        *(version_key(POST, pk)
+          for pk in Post.objects.values_list("pk", flat=True)),
+        *(version_key(AUTHOR, pk) for pk in user_ids),
+        *(version_key(FOLLOW, pk) for pk in user_ids),
+    )
@@ -0,0 +1,19 @@
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from .cache_versions import CACHE_ALIAS
+
+
+@checks.register(checks.Tags.caches)
+def check_versions_cache(app_configs, **kwargs):
+    backend = caches[CACHE_ALIAS]
+    if isinstance(backend, (LocMemCache, DummyCache)):
+        return [checks.Error(
+            "Кеш версий должен быть общим для всех процессов.",
+            hint=f"Укажите в CACHES['{CACHE_ALIAS}'] файловый кеш, "
+                 "Memcached или Redis.",
+            id="posts.E001",
+        )]
+    return []
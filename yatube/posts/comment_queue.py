@@ -0,0 +1,197 @@
+import fcntl
+import glob
+import json
+import logging
+import os
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings as st
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import cache_versions as versions
+from . import counters
+from .models import Comment, Post, User
+from .utils import keep_dates
+
+logger = logging.getLogger(__name__)
+
+PENDING_SESSION_KEY = "pending_comments"
+PENDING_TTL = timedelta(hours=1)
+REQUIRED_KEYS = ("post_id", "author_id", "text", "created")
+
+
+class _Locked:
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.path + ".lock", "a")
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+def enqueue(request, post_id, text):
+    record = {
+        "id": uuid.uuid4().hex,
+        "post_id": post_id,
+        "author_id": request.user.pk,
+        "text": text,
+        "created": timezone.now().isoformat(),
+    }
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    path = st.COMMENT_SPOOL_PATH
+    with _Locked(path):
+        with open(path, "a", encoding="utf-8") as spool:
+            spool.write(line)
+            spool.flush()
+            os.fsync(spool.fileno())
+    pending = request.session.get(PENDING_SESSION_KEY, [])
+    request.session[PENDING_SESSION_KEY] = pending + [record]
+    # Страница поста у автора должна сразу показать комментарий,
+    # а не ответить 304 по старому ETag.
+    versions.bump(versions.version_key(versions.POST, post_id))
+    return record
+
+
+def pending_for(request, post):
+    pending = request.session.get(PENDING_SESSION_KEY)
+    if not pending:
+        return []
+    expires = timezone.now() - PENDING_TTL
+    fresh = [record for record in pending
+             if parse_datetime(record["created"]) > expires]
+    mine = [record for record in fresh if record["post_id"] == post.pk]
+    if mine:
+        stored = {spool_id.hex for spool_id in Comment.objects.filter(
+            post=post, spool_id__in=[record["id"] for record in mine],
+        ).values_list("spool_id", flat=True)}
+        fresh = [record for record in fresh if record["id"] not in stored]
+        mine = [record for record in mine if record in fresh]
+    if fresh != pending:
+        request.session[PENDING_SESSION_KEY] = fresh
+    return mine
+
+
+def _claim(path):
+    """Переименовывает очередь под блокировкой: новые записи идут в новый файл.
+
+    Файлы, оставшиеся от прерванного сброса, забираются тоже.
+    """
+    with _Locked(path):
+        if os.path.exists(path) and os.path.getsize(path):
+            os.replace(path, f"{path}.{uuid.uuid4().hex}.processing")
+    return sorted(glob.glob(f"{path}.*.processing"))
+
+
+def _parse(line):
+    record = json.loads(line)
+    if (not isinstance(record, dict)
+            or any(key not in record for key in REQUIRED_KEYS)
+            or parse_datetime(record["created"]) is None):
+        raise ValueError("Неполная запись очереди")
+    return record
+
+
+def _records(paths):
+    for path in paths:
+        with open(path, encoding="utf-8", errors="replace") as spool:
+            for line in spool:
+                if not line.strip():
+                    continue
+                try:
+                    record = _parse(line)
+                except (ValueError, TypeError):
+                    # Обрезанная при сбое строка не должна останавливать
+                    # все следующие сбросы; её можно разобрать вручную.
+                    _reject(line)
+                    continue
+                yield record
+
+
+def _reject(line):
+    logger.warning("Пропущена повреждённая запись очереди комментариев")
+    with open(st.COMMENT_SPOOL_PATH + ".rejected", "a",
+              encoding="utf-8") as rejected:
+        rejected.write(line if line.endswith("\n") else line + "\n")
+
+
+def _store(batch):
+    post_ids = set(Post.objects.filter(
+        pk__in={record["post_id"] for record in batch}
+    ).values_list("pk", flat=True))
+    author_ids = set(User.objects.filter(
+        pk__in={record["author_id"] for record in batch}
+    ).values_list("pk", flat=True))
+    # Очередь удаляется после коммита; если процесс упал между ними,
+    # уже сохранённые записи пропускаются по ключу.
+    stored = {spool_id.hex for spool_id in Comment.objects.filter(
+        spool_id__in=[record["id"] for record in batch if record.get("id")]
+    ).values_list("spool_id", flat=True)}
+    comments = []
+    for record in batch:
+        if (record["post_id"] not in post_ids
+                or record["author_id"] not in author_ids
+                or record.get("id") in stored):
+            continue
+        created = parse_datetime(record["created"])
+        comments.append(Comment(
+            post_id=record["post_id"], author_id=record["author_id"],
+            text=record["text"], created=created, pub_date=created,
+            spool_id=record.get("id"),
+        ))
+        if record.get("id"):
+            stored.add(record["id"])
+    Comment.objects.bulk_create(comments, ignore_conflicts=True)
+    # Пропущенные по ключу строки bulk_create не сообщает: вставленные
+    # находятся заново, чтобы не завысить счётчики комментариев.
+    # Ключи уже сохранённых раньше записей сюда не попадают.
+    added = Counter(Comment.objects.filter(spool_id__in=[
+        comment.spool_id for comment in comments if comment.spool_id
+    ]).values_list("post_id", flat=True))
+    added.update(comment.post_id for comment in comments
+                 if not comment.spool_id)
+    return added
+
+
+def flush(batch_size=None):
+    """Сохраняет накопленные комментарии пачками; возвращает их число.
+
+    Сбросы из cron и из --interval не пересекаются: второй ждёт первого,
+    иначе оба обработали бы одни и те же файлы.
+    """
+    batch_size = min(batch_size or st.COMMENT_FLUSH_BATCH, 500)
+    with _Locked(st.COMMENT_SPOOL_PATH + ".flush"):
+        return _flush(batch_size)
+
+
+def _flush(batch_size):
+    paths = _claim(st.COMMENT_SPOOL_PATH)
+    if not paths:
+        return 0
+    per_post = Counter()
+    batch = []
+    with transaction.atomic(), keep_dates(Comment):
+        for record in _records(paths):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                per_post += _store(batch)
+                batch = []
+        if batch:
+            per_post += _store(batch)
+        # bulk_create не отправляет сигналы.
+        for post_id, added in per_post.items():
+            counters.change_comments(post_id, added)
+        versions.bump(*(versions.version_key(versions.POST, post_id)
+                        for post_id in per_post))
+    for path in paths:
+        os.remove(path)
+    return sum(per_post.values())
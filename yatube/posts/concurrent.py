@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from threading import Lock
+
+from django.conf import settings as st
+from django.db import connection
+
+_executor = None
+_lock = Lock()
+
+
+def get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=st.VIEW_QUERY_WORKERS,
+                thread_name_prefix="view-query",
+            )
+    return _executor
+
+
+def gather(*funcs):
+    # Внутри транзакции другие потоки не видят её изменений, поэтому
+    # запросы выполняются последовательно в текущем потоке.
+    if st.VIEW_QUERY_WORKERS < 1 or connection.in_atomic_block:
+        return [func() for func in funcs]
+    executor = get_executor()
+    futures = [executor.submit(copy_context().run, func)
+               for func in funcs[1:]]
+    first = funcs[0]()
+    return [first, *(future.result() for future in futures)]
@@ -0,0 +1,83 @@
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Comment, Counters, Follow, Post
+
+
+def _actual(user_id):
+    return {
+        "posts_count": Post.objects.filter(author_id=user_id).count(),
+        "followers_count": Follow.objects.filter(author_id=user_id).count(),
+        "following_count": Follow.objects.filter(user_id=user_id).count(),
+    }
+
+
+def get_counters(user):
+    counters = Counters.objects.filter(user=user).first()
+    if counters is None:
+        counters, _ = Counters.objects.get_or_create(
+            user=user, defaults=_actual(user.pk)
+        )
+    return counters
+
+
+def change(user_id, **deltas):
+    # Отсутствующая строка будет посчитана целиком в get_counters.
+    Counters.objects.filter(user_id=user_id).update(
+        **{name: Greatest(F(name) + delta, 0)
+           for name, delta in deltas.items()}
+    )
+
+
+def change_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=Greatest(F("comment_count") + delta, 0)
+    )
+
+
+def _grouped(queryset, field):
+    return dict(
+        queryset.values_list(field).annotate(total=Count("id")).order_by()
+    )
+
+
+def reconcile(batch_size=500):
+    posts = _grouped(Post.objects.all(), "author")
+    followers = _grouped(Follow.objects.all(), "author")
+    following = _grouped(Follow.objects.all(), "user")
+    stale, missing = [], []
+    existing = Counters.objects.in_bulk()
+    user_ids = set(posts) | set(followers) | set(following) | set(existing)
+    for user_id in user_ids:
+        actual = Counters(
+            user_id=user_id,
+            posts_count=posts.get(user_id, 0),
+            followers_count=followers.get(user_id, 0),
+            following_count=following.get(user_id, 0),
+        )
+        current = existing.get(user_id)
+        if current is None:
+            missing.append(actual)
+        elif (
+            current.posts_count, current.followers_count,
+            current.following_count,
+        ) != (
+            actual.posts_count, actual.followers_count,
+            actual.following_count,
+        ):
+            stale.append(actual)
+    Counters.objects.bulk_create(missing, batch_size=batch_size)
+    Counters.objects.bulk_update(
+        stale, ["posts_count", "followers_count", "following_count"],
+        batch_size=batch_size,
+    )
+    comments = _grouped(Comment.objects.all(), "post")
+    drifted = []
+    for post in Post.objects.only("id", "comment_count").iterator():
+        actual = comments.get(post.id, 0)
+        if post.comment_count != actual:
+            post.comment_count = actual
+            drifted.append(post)
+    Post.objects.bulk_update(drifted, ["comment_count"],
+                             batch_size=batch_size)
+    return len(missing) + len(stale), len(drifted)
@@ -0,0 +1,104 @@
+from django.conf import settings as st
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from .freshness import group_state, index_state, profile_state, public
+from .models import Group, Post, User
+
+
+class LatestPostsFeed(Feed):
+    title = "Yatube: последние записи"
+    link = reverse_lazy("posts:index")
+    description = "Новые записи всех авторов"
+
+    def __call__(self, request, *args, **kwargs):
+        response = super().__call__(request, *args, **kwargs)
+        # Feed ставит время самой новой записи, а оно не растёт при
+        # удалении записей; проверка свежести идёт по ETag.
+        del response["Last-Modified"]
+        return response
+
+    def items(self):
+        return Post.objects.select_related("author")[:st.FEED_ITEMS]
+
+    def item_title(self, post):
+        return Truncator(post.text).words(8)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse("posts:post_detail", kwargs={"post_id": post.pk})
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated_at
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return f"Yatube: {group.title}"
+
+    def link(self, group):
+        return reverse("posts:group_list", kwargs={"slug": group.slug})
+
+    def description(self, group):
+        return group.description
+
+    def items(self, group):
+        return group.posts.select_related("author")[:st.FEED_ITEMS]
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f"Yatube: {author.get_full_name() or author.username}"
+
+    def link(self, author):
+        return reverse("posts:profile", kwargs={"username": author.username})
+
+    def description(self, author):
+        return f"Записи автора {author.username}"
+
+    def items(self, author):
+        return author.posts.select_related("author")[:st.FEED_ITEMS]
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, group):
+        return group.description
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author):
+        return self.description(author)
+
+
+index_rss = public(index_state)(LatestPostsFeed())
+index_atom = public(index_state)(LatestPostsAtomFeed())
+group_rss = public(group_state)(GroupPostsFeed())
+group_atom = public(group_state)(GroupPostsAtomFeed())
+profile_rss = public(profile_state)(AuthorPostsFeed())
+profile_atom = public(profile_state)(AuthorPostsAtomFeed())
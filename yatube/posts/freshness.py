@@ -0,0 +1,149 @@
+import hashlib
+
+from django.conf import settings as st
+from django.db.models import Max
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
+
+from . import cache_versions as versions
+from .models import Comment, Group, Post, User
+
+
+def latest_post(**filters):
+    return Post.objects.filter(**filters).aggregate(
+        latest=Max("pub_date")
+    )["latest"]
+
+
+def post_state(request, post_id):
+    row = Post.objects.filter(pk=post_id).values(
+        "pub_date", "author_id"
+    ).order_by().first()
+    if row is None:
+        return None
+    last_comment = Comment.objects.filter(post_id=post_id).aggregate(
+        latest=Max("created")
+    )["latest"]
+    last_modified = max(filter(None, (
+        row["pub_date"], last_comment, latest_post(author_id=row["author_id"])
+    )))
+    version = versions.get_versions(
+        versions.version_key(versions.POST, post_id),
+        versions.version_key(versions.AUTHOR, row["author_id"]),
+    )
+    return last_modified, version
+
+
+def profile_state(request, username):
+    row = User.objects.filter(username=username).values(
+        "pk", "date_joined"
+    ).order_by().first()
+    if row is None:
+        return None
+    return (
+        latest_post(author_id=row["pk"]) or row["date_joined"],
+        versions.get_version(versions.AUTHOR, row["pk"]),
+    )
+
+
+def group_state(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        "pk", flat=True
+    ).order_by().first()
+    if group_id is None:
+        return None
+    return (
+        latest_post(group_id=group_id),
+        versions.get_version(versions.GROUP, group_id),
+    )
+
+
+def index_state(request):
+    return latest_post(), versions.get_version(versions.FEED)
+
+
+def shard_state(request, shard):
+    first, last = shard_range(shard)
+    latest = latest_post(pk__gte=first, pk__lte=last)
+    if latest is None:
+        return None
+    return latest, versions.get_version(versions.FEED)
+
+
+def shard_range(shard):
+    return ((shard - 1) * st.SITEMAP_SHARD_SIZE + 1,
+            shard * st.SITEMAP_SHARD_SIZE)
+
+
+def _memoized(state_func):
+    # Состояние считается один раз на запрос.
+    def state(request, *args, **kwargs):
+        if not hasattr(request, "_freshness"):
+            request._freshness = state_func(request, *args, **kwargs)
+        return request._freshness
+    return state
+
+
+def _digest(*parts):
+    return hashlib.sha1(":".join(parts).encode()).hexdigest()
+
+
+def public(state_func):
+    """Валидатор для лент и карты сайта: они одинаковы для всех.
+
+    Как и в conditional, отдаётся только ETag с версией кеша.
+    """
+    state = _memoized(state_func)
+
+    def etag(request, *args, **kwargs):
+        current = state(request, *args, **kwargs)
+        if current is None:
+            return None
+        last_modified, version = current
+        return _digest(
+            last_modified.isoformat() if last_modified else "", version
+        )
+
+    def decorator(view):
+        return cache_control(public=True, max_age=st.FEED_MAX_AGE)(
+            condition(etag_func=etag)(view)
+        )
+    return decorator
+
+
+def conditional(state_func):
+    """Отдаёт 304, если страница не менялась с прошлого запроса клиента.
+
+    ETag учитывает пользователя и CSRF-куки. Last-Modified не отдаётся:
+    правка или удаление записи не двигают время вперёд, и клиент с одним
+    If-Modified-Since получил бы старую страницу; правки видит версия
+    в ETag.
+    """
+    state = _memoized(state_func)
+
+    def etag(request, *args, **kwargs):
+        current = state(request, *args, **kwargs)
+        if current is None:
+            return None
+        last_modified, version = current
+        if request.user.is_authenticated:
+            # Версия ленты читателя меняется при его подписках,
+            # а от них зависит блок рекомендаций.
+            viewer = "{}:{}:{}".format(
+                request.user.pk,
+                request.COOKIES.get(st.CSRF_COOKIE_NAME, ""),
+                versions.get_version(versions.FOLLOW, request.user.pk),
+            )
+        else:
+            viewer = "anonymous"
+        return _digest(
+            last_modified.isoformat() if last_modified else "",
+            version,
+            viewer,
+            request.GET.urlencode(),
+        )
+
+    def decorator(view):
+        return vary_on_cookie(condition(etag_func=etag)(view))
+    return decorator
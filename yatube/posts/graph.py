@@ -0,0 +1,150 @@
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from threading import Lock
+
+from django.conf import settings as st
+from django.db import connection, transaction
+
+from .models import Follow
+
+_graph = None
+_lock = Lock()
+
+
+def _edge(user_id, author_id):
+    return user_id << 32 | author_id
+
+
+class FollowerGraph:
+    """Подписки всех пользователей в памяти процесса.
+
+    following хранит отсортированные массивы авторов каждого читателя,
+    edges - упакованные пары (читатель, автор) для проверки за O(1).
+    """
+
+    def __init__(self, pairs):
+        self.loaded = time.monotonic()
+        self.following = {}
+        self.edges = set()
+        for user_id, author_id in pairs:
+            self.following.setdefault(user_id, array("l")).append(author_id)
+            self.edges.add(_edge(user_id, author_id))
+        for authors in self.following.values():
+            authors[:] = array("l", sorted(authors))
+
+    @classmethod
+    def load(cls):
+        return cls(Follow.objects.values_list(
+            "user_id", "author_id"
+        ).order_by().iterator())
+
+    def expired(self):
+        return time.monotonic() - self.loaded > st.FOLLOW_GRAPH_TTL
+
+    def follows(self, user_id, author_id):
+        return _edge(user_id, author_id) in self.edges
+
+    def authors(self, user_id):
+        return self.following.get(user_id, ())
+
+    def add(self, user_id, author_id):
+        if _edge(user_id, author_id) in self.edges:
+            return
+        self.edges.add(_edge(user_id, author_id))
+        insort(self.following.setdefault(user_id, array("l")), author_id)
+
+    def remove(self, user_id, author_id):
+        if _edge(user_id, author_id) not in self.edges:
+            return
+        self.edges.discard(_edge(user_id, author_id))
+        authors = self.following[user_id]
+        del authors[bisect_left(authors, author_id)]
+
+    def suggestions(self, user_id, limit, fanout):
+        followed = self.authors(user_id)
+        counts = Counter()
+        # У последних подписок больше шансов быть актуальными.
+        for friend_id in followed[-fanout:]:
+            counts.update(self.authors(friend_id))
+        counts.pop(user_id, None)
+        for author_id in followed:
+            counts.pop(author_id, None)
+        return [author_id for author_id, _ in sorted(
+            counts.items(), key=lambda item: (-item[1], item[0])
+        )[:limit]]
+
+
+class EdgeChange:
+    def __init__(self, user_id, author_id, added):
+        self.user_id = user_id
+        self.author_id = author_id
+        self.added = added
+
+    def __call__(self):
+        graph = _graph
+        if graph is not None:
+            with _lock:
+                if self.added:
+                    graph.add(self.user_id, self.author_id)
+                else:
+                    graph.remove(self.user_id, self.author_id)
+
+
+def record(follow, added):
+    transaction.on_commit(EdgeChange(follow.user_id, follow.author_id, added))
+
+
+def reset():
+    global _graph
+    with _lock:
+        _graph = None
+
+
+def _pending():
+    # Изменения незакоммиченной транзакции ещё лежат в on_commit;
+    # при откате Django убирает их оттуда сам.
+    return [func for _, func in connection.run_on_commit
+            if isinstance(func, EdgeChange)]
+
+
+def get_graph():
+    """Общий граф процесса или None, если его нельзя использовать.
+
+    Граф загружается только вне транзакции: внутри неё он мог бы
+    увидеть данные, которые потом откатятся.
+    """
+    global _graph
+    graph = _graph
+    if graph is not None and not graph.expired():
+        return graph
+    if connection.in_atomic_block:
+        return None
+    with _lock:
+        if _graph is None or _graph.expired():
+            _graph = FollowerGraph.load()
+        return _graph
+
+
+def follows(user_id, author_id):
+    graph = get_graph()
+    if graph is None:
+        return Follow.objects.filter(
+            user_id=user_id, author_id=author_id
+        ).exists()
+    result = graph.follows(user_id, author_id)
+    for change in _pending():
+        if (change.user_id, change.author_id) == (user_id, author_id):
+            result = change.added
+    return result
+
+
+def suggestions(user_id, limit=None, fanout=None):
+    limit = limit or st.FOLLOW_SUGGESTIONS
+    fanout = fanout or st.FOLLOW_SUGGESTIONS_FANOUT
+    graph = get_graph()
+    if graph is None or _pending():
+        # Внутри транзакции граф строится заново и учитывает её изменения.
+        graph = FollowerGraph.load()
+    return graph.suggestions(user_id, limit, fanout)
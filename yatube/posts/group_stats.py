@@ -0,0 +1,105 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Subquery
+from django.db.models.functions import Greatest
+
+from .models import GroupAuthorStats, GroupStats, Post
+
+
+def _actual(group_id):
+    posts = Post.objects.filter(group_id=group_id).order_by()
+    authors = dict(
+        posts.values_list("author_id").annotate(total=Count("id"))
+    )
+    return posts.aggregate(last=Max("pub_date"))["last"], authors
+
+
+def build(group_id):
+    try:
+        with transaction.atomic():
+            last_pub_date, authors = _actual(group_id)
+            GroupAuthorStats.objects.filter(group_id=group_id).delete()
+            GroupAuthorStats.objects.bulk_create(
+                [GroupAuthorStats(group_id=group_id, author_id=author_id,
+                                  posts_count=total)
+                 for author_id, total in authors.items()],
+                batch_size=500,
+            )
+            stats, _ = GroupStats.objects.update_or_create(
+                group_id=group_id,
+                defaults={
+                    "posts_count": sum(authors.values()),
+                    "authors_count": len(authors),
+                    "last_pub_date": last_pub_date,
+                },
+            )
+    except IntegrityError:
+        # Статистику параллельно построил другой запрос.
+        return GroupStats.objects.get(group_id=group_id)
+    return stats
+
+
+def get_stats(groups):
+    """Статистика для списка сообществ; недостающая считается целиком."""
+    stats = GroupStats.objects.in_bulk([group.pk for group in groups])
+    for group in groups:
+        if group.pk not in stats:
+            stats[group.pk] = build(group.pk)
+    return stats
+
+
+def change(group_id, author_id, delta, pub_date):
+    # Как и в counters.change, отсутствующая строка будет посчитана целиком
+    # при чтении в get_stats.
+    if group_id is None or not GroupStats.objects.filter(
+        group_id=group_id
+    ).exists():
+        return
+    group_authors = GroupAuthorStats.objects.filter(group_id=group_id)
+    authors = group_authors.filter(author_id=author_id)
+    if not authors.update(posts_count=Greatest(F("posts_count") + delta, 0)):
+        # Строки автора нет и при удалении пользователя: каскад удаляет её
+        # раньше, чем его посты.
+        if delta > 0:
+            GroupAuthorStats.objects.create(group_id=group_id,
+                                            author_id=author_id,
+                                            posts_count=delta)
+    else:
+        authors.filter(posts_count=0).delete()
+    stats = GroupStats.objects.filter(group_id=group_id)
+    stats.update(
+        posts_count=Greatest(F("posts_count") + delta, 0),
+        authors_count=group_authors.count(),
+    )
+    if delta > 0:
+        stats.filter(last_pub_date__isnull=True).update(
+            last_pub_date=pub_date
+        )
+        stats.filter(last_pub_date__lt=pub_date).update(
+            last_pub_date=pub_date
+        )
+    else:
+        # Удалён или перенесён последний пост - берём предыдущий по индексу.
+        stats.filter(last_pub_date__lte=pub_date).update(
+            last_pub_date=Subquery(
+                Post.objects.filter(group_id=group_id).order_by(
+                    "-pub_date"
+                ).values("pub_date")[:1]
+            )
+        )
+
+
+def reconcile():
+    """Пересчитывает статистику сообществ, которая разошлась с постами."""
+    fixed = 0
+    for stats in GroupStats.objects.all():
+        last_pub_date, authors = _actual(stats.group_id)
+        current = dict(
+            GroupAuthorStats.objects.filter(group_id=stats.group_id)
+            .values_list("author_id", "posts_count")
+        )
+        if (current, stats.last_pub_date, stats.posts_count,
+                stats.authors_count) != (authors, last_pub_date,
+                                         sum(authors.values()), len(authors)):
+            build(stats.group_id)
+            fixed += 1
+    return fixed
@@ -0,0 +1,89 @@
+import math
+from datetime import datetime, timezone
+
+from django.conf import settings as st
+from django.core.paginator import Paginator
+from django.db import transaction
+
+from . import cache_versions as versions
+from .models import Comment, HotCheckpoint, Post, PostScore
+
+# Вес комментария 2 ** ((created - EPOCH) / HOT_HALF_LIFE) растёт со
+# временем, а не затухает: делить все веса на общий множитель "сейчас"
+# незачем, порядок постов от этого не меняется. Поэтому рейтинг считается
+# один раз при появлении комментария, а хранится его логарифм, чтобы
+# числа не переполнялись.
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def exponent(created):
+    return ((created - EPOCH).total_seconds() / st.HOT_HALF_LIFE
+            * math.log(2))
+
+
+def log_add(a, b):
+    if a is None:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def update(batch_size=None):
+    """Учитывает комментарии, появившиеся после прошлого запуска."""
+    batch_size = batch_size or st.HOT_BATCH
+    total = 0
+    while True:
+        with transaction.atomic():
+            checkpoint, _ = HotCheckpoint.objects.select_for_update(
+            ).get_or_create(pk=1)
+            rows = list(
+                Comment.objects.filter(pk__gt=checkpoint.last_comment_id)
+                .order_by("pk").values_list("pk", "post_id", "created")
+                [:batch_size]
+            )
+            if not rows:
+                break
+            gains = {}
+            for _, post_id, created in rows:
+                gains[post_id] = log_add(gains.get(post_id),
+                                         exponent(created))
+            scores = PostScore.objects.in_bulk(list(gains))
+            for post_id, gain in gains.items():
+                if post_id in scores:
+                    scores[post_id].score = log_add(scores[post_id].score,
+                                                    gain)
+            PostScore.objects.bulk_update(
+                [scores[post_id] for post_id in gains if post_id in scores],
+                ["score"], batch_size=st.HOT_BATCH // 2 or 1,
+            )
+            PostScore.objects.bulk_create(
+                PostScore(post_id=post_id, score=gain)
+                for post_id, gain in gains.items() if post_id not in scores
+            )
+            checkpoint.last_comment_id = rows[-1][0]
+            checkpoint.save()
+        total += len(rows)
+    if total:
+        versions.bump(versions.version_key(versions.HOT))
+    return total
+
+
+def rebuild():
+    with transaction.atomic():
+        PostScore.objects.all().delete()
+        HotCheckpoint.objects.all().delete()
+    return update()
+
+
+def popular_page(request):
+    ranking = PostScore.objects.order_by("-score", "-post_id").values_list(
+        "post_id", flat=True
+    )
+    page_obj = Paginator(ranking, st.POST_LIMIT).get_page(
+        request.GET.get("page")
+    )
+    posts = Post.objects.select_related("author", "group").prefetch_related(
+        "renditions"
+    ).in_bulk(list(page_obj))
+    page_obj.object_list = [posts[pk] for pk in page_obj if pk in posts]
+    return page_obj
@@ -0,0 +1,60 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import Post, StoredImage
+
+
+def storage():
+    return Post._meta.get_field("image").storage
+
+
+def acquire(name):
+    if not name:
+        return
+    with transaction.atomic():
+        # get_or_create переживает параллельное создание той же строки,
+        # а блокировка строки упорядочивает её с release.
+        _, created = StoredImage.objects.select_for_update().get_or_create(
+            name=name, defaults={"refs": 1}
+        )
+        if not created:
+            StoredImage.objects.filter(name=name).update(
+                refs=F("refs") + 1
+            )
+
+
+def release(name):
+    if not name:
+        return
+    with transaction.atomic():
+        image = StoredImage.objects.select_for_update().filter(
+            name=name
+        ).first()
+        if image is None:
+            return
+        StoredImage.objects.filter(name=name).update(
+            refs=Greatest(F("refs") - 1, 0)
+        )
+    if image.refs <= 1:
+        # Строка с нулём ссылок остаётся до коммита: загрузка той же
+        # картинки в это время вернёт её к жизни.
+        transaction.on_commit(partial(_delete_unused, name))
+
+
+def _delete_unused(name):
+    # Решение принимается заново: картинку могли загрузить снова.
+    with transaction.atomic():
+        deleted, _ = StoredImage.objects.filter(
+            name=name, refs__lte=0
+        ).delete()
+        if deleted:
+            storage().delete(name)
+
+
+def replace(old_name, new_name):
+    if old_name != new_name:
+        acquire(new_name)
+        release(old_name)
@@ -0,0 +1,22 @@
+import os
+
+from PIL import Image, ImageOps
+
+# Модуль выполняется в дочерних процессах пула, поэтому не импортирует
+# Django: всё нужное передаётся аргументами.
+EXTENSIONS = {"jpeg": "jpg", "webp": "webp"}
+
+
+def make_renditions(source_path, media_root, prefix, sizes, formats):
+    renditions = []
+    with Image.open(source_path) as image:
+        image = image.convert("RGB")
+        for width, height in sizes:
+            fitted = ImageOps.fit(image, (width, height), Image.LANCZOS)
+            for fmt in formats:
+                name = f"{prefix}_{width}x{height}.{EXTENSIONS[fmt]}"
+                path = os.path.join(media_root, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fitted.save(path, fmt.upper(), quality=85)
+                renditions.append((name, width, height, fmt))
+    return renditions
@@ -0,0 +1,32 @@
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Разбор строк выполняется в дочерних процессах пула, поэтому модуль
+# не импортирует Django.
+
+
+def dumps(record):
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"),
+                      default=str)
+
+
+def parse_lines(lines):
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def read_records(file, workers=0, chunk_size=1000):
+    blocks = iter(lambda: list(islice(file, chunk_size)), [])
+    if not workers:
+        for block in blocks:
+            yield from parse_lines(block)
+        return
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        while True:
+            window = list(islice(blocks, workers * 2))
+            if not window:
+                return
+            for records in pool.map(parse_lines, window):
+                yield from records
@@ -0,0 +1,99 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen
+
+from django.core.cache import cache
+from django.core.servers.basehttp import (
+    ThreadedWSGIServer, WSGIRequestHandler,
+)
+from django.test import override_settings
+from django.urls import reverse
+
+from posts import concurrent
+from posts.models import Post, User
+
+from .bench_views import Command as BenchCommand, percentile
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BenchCommand):
+    help = (
+        "Сравнивает пропускную способность WSGI-приложения под "
+        "конкурентной нагрузкой с последовательными и параллельными "
+        "запросами в profile и post_detail"
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--clients", type=int, default=8,
+                            help="Одновременных клиентов")
+        parser.add_argument("--workers", type=int, default=4,
+                            help="Значение VIEW_QUERY_WORKERS")
+
+    def handle(self, *args, **options):
+        self.options = options
+        super().handle(*args, **options)
+
+    def urls(self):
+        users = list(User.objects.values_list("username", flat=True))
+        post_ids = list(Post.objects.values_list("id", flat=True))
+        return {
+            "profile": lambda: reverse(
+                "posts:profile", args=[random.choice(users)]
+            ),
+            "post_detail": lambda: reverse(
+                "posts:post_detail", args=[random.choice(post_ids)]
+            ),
+        }
+
+    @override_settings(DEBUG=False)
+    def measure(self, requests):
+        from yatube.wsgi import application
+
+        server = ThreadedWSGIServer(("127.0.0.1", 0), QuietHandler)
+        server.set_app(application)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        base = "http://127.0.0.1:{}".format(server.server_port)
+        try:
+            results = {}
+            for workers in (0, self.options["workers"]):
+                concurrent._executor = None
+                with override_settings(VIEW_QUERY_WORKERS=workers):
+                    results[f"workers_{workers}"] = {
+                        name: self.load(base, url, requests)
+                        for name, url in self.urls().items()
+                    }
+                    self.stderr.write(
+                        f"workers={workers}: {results[f'workers_{workers}']}"
+                    )
+        finally:
+            server.shutdown()
+            server.server_close()
+        return results
+
+    def load(self, base, url, requests):
+        cache.clear()
+        clients = self.options["clients"]
+
+        def fetch(_):
+            started = time.perf_counter()
+            with urlopen(base + url()) as response:
+                response.read()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            timings = list(pool.map(fetch, range(requests * clients)))
+        elapsed = time.perf_counter() - started
+        return {
+            "requests_per_second": round(len(timings) / elapsed, 1),
+            "p50_ms": round(percentile(timings, 50) * 1000, 3),
+            "p95_ms": round(percentile(timings, 95) * 1000, 3),
+        }
@@ -0,0 +1,200 @@
+import json
+import random
+import subprocess
+import time
+import tracemalloc
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from faker import Faker
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+def percentile(values, rank):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1,
+                       round(rank / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет тестовую базу данными заданного объёма и замеряет "
+        "задержку, число запросов и пиковую память представлений posts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--groups", type=int, default=20)
+        parser.add_argument("--posts", type=int, default=5000)
+        parser.add_argument("--follows", type=int, default=20,
+                            help="Подписок на одного пользователя")
+        parser.add_argument("--comments", type=int, default=10000)
+        parser.add_argument("--requests", type=int, default=50,
+                            help="Запросов к каждому представлению")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Файл для JSON-отчёта")
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        Faker.seed(options["seed"])
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            started = time.perf_counter()
+            self.seed(options)
+            seeded = time.perf_counter() - started
+            report = {
+                "commit": self.commit(),
+                "config": {
+                    key: options[key] for key in (
+                        "users", "groups", "posts", "follows", "comments",
+                        "requests", "seed",
+                    )
+                },
+                "seed_seconds": round(seeded, 3),
+                "views": self.measure(options["requests"]),
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def seed(self, options):
+        fake = Faker("ru_RU")
+        password = make_password(None)
+        User.objects.bulk_create(
+            User(username=f"bench_{i}", first_name=fake.first_name(),
+                 last_name=fake.last_name(), password=password)
+            for i in range(options["users"])
+        )
+        Group.objects.bulk_create(
+            Group(title=fake.sentence(nb_words=3)[:200], slug=f"group-{i}",
+                  description=fake.text(200))
+            for i in range(options["groups"])
+        )
+        user_ids = list(User.objects.values_list("id", flat=True))
+        group_ids = list(Group.objects.values_list("id", flat=True)) + [None]
+        Post.objects.bulk_create(
+            (Post(author_id=random.choice(user_ids),
+                  group_id=random.choice(group_ids),
+                  text=fake.text(400))
+             for _ in range(options["posts"]))
+        )
+        follows = []
+        count = min(options["follows"], len(user_ids) - 1)
+        for user_id in user_ids:
+            # Лишний автор в выборке заменяет самого пользователя,
+            # если тот в неё попал; подписок ровно count.
+            authors = [
+                author_id for author_id in random.sample(user_ids, count + 1)
+                if author_id != user_id
+            ][:count]
+            follows.extend((user_id, author_id) for author_id in authors)
+        Follow.objects.bulk_create(
+            (Follow(user_id=user_id, author_id=author_id)
+             for user_id, author_id in follows)
+        )
+        post_ids = list(Post.objects.values_list("id", flat=True))
+        Comment.objects.bulk_create(
+            (Comment(post_id=random.choice(post_ids),
+                     author_id=random.choice(user_ids),
+                     text=fake.sentence()[:50])
+             for _ in range(options["comments"]))
+        )
+        for command in ("rebuild_timeline", "reconcile_counters",
+                        "rebuild_search_index"):
+            call_command(command, stdout=StringIO())
+
+    def scenarios(self):
+        users = list(User.objects.values_list("username", flat=True))
+        slugs = list(Group.objects.values_list("slug", flat=True))
+        post_ids = list(Post.objects.values_list("id", flat=True))
+
+        def page():
+            return {"page": random.randint(1, 5)}
+
+        return {
+            "index": lambda: ("get", reverse("posts:index"), page()),
+            "group_posts": lambda: ("get", reverse(
+                "posts:group_list", args=[random.choice(slugs)]
+            ), page()),
+            "profile": lambda: ("get", reverse(
+                "posts:profile", args=[random.choice(users)]
+            ), page()),
+            "post_detail": lambda: ("get", reverse(
+                "posts:post_detail", args=[random.choice(post_ids)]
+            ), None),
+            "follow_index": lambda: ("get", reverse(
+                "posts:follow_index"
+            ), page()),
+            "post_create": lambda: ("post", reverse("posts:post_create"),
+                                    {"text": "Пост из бенчмарка"}),
+            "add_comment": lambda: ("post", reverse(
+                "posts:add_comment", args=[random.choice(post_ids)]
+            ), {"text": "Комментарий из бенчмарка"}),
+            "profile_follow": lambda: ("get", reverse(
+                "posts:profile_follow", args=[random.choice(users)]
+            ), None),
+            "profile_unfollow": lambda: ("get", reverse(
+                "posts:profile_unfollow", args=[random.choice(users)]
+            ), None),
+        }
+
+    @override_settings(DEBUG=False)
+    def measure(self, requests):
+        client = Client()
+        client.force_login(User.objects.order_by("?").first())
+        results = {}
+        for name, scenario in self.scenarios().items():
+            cache.clear()
+            timings, queries = [], []
+            for _ in range(requests):
+                method, url, data = scenario()
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    response = getattr(client, method)(url, data)
+                    timings.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    raise RuntimeError(
+                        f"{name}: {url} вернул {response.status_code}"
+                    )
+                queries.append(len(context.captured_queries))
+            method, url, data = scenario()
+            tracemalloc.start()
+            getattr(client, method)(url, data)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[name] = {
+                "p50_ms": round(percentile(timings, 50) * 1000, 3),
+                "p95_ms": round(percentile(timings, 95) * 1000, 3),
+                "p99_ms": round(percentile(timings, 99) * 1000, 3),
+                "queries_mean": round(sum(queries) / len(queries), 2),
+                "queries_max": max(queries),
+                "peak_memory_kib": round(peak / 1024, 1),
+            }
+            self.stderr.write(f"{name}: {results[name]}")
+        return results
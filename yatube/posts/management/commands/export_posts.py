@@ -0,0 +1,66 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from posts.jsonl import dumps
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+# Порядок важен: при импорте записи ссылаются только на уже прочитанные.
+EXPORTS = (
+    ("user", User.objects.all(), (
+        "username", "first_name", "last_name", "email", "date_joined",
+    )),
+    ("group", Group.objects.all(), ("slug", "title", "description")),
+    ("post", Post.objects.all(), (
+        "id", "text", "pub_date", "author__username", "group__slug",
+        "image",
+    )),
+    ("comment", Comment.objects.all(), (
+        "post_id", "author__username", "text", "created",
+    )),
+    ("follow", Follow.objects.all(), (
+        "user__username", "author__username",
+    )),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает пользователей, сообщества, посты, комментарии и "
+        "подписки в JSONL"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Файл (по умолчанию stdout)")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                totals = self.export(file, options["chunk_size"])
+        else:
+            totals = self.export(sys.stdout, options["chunk_size"])
+        self.stderr.write(", ".join(
+            f"{kind}: {count}" for kind, count in totals.items()
+        ))
+
+    def export(self, file, chunk_size):
+        totals = {}
+        for kind, queryset, fields in EXPORTS:
+            rows = queryset.order_by("pk").values(*fields).iterator(
+                chunk_size=chunk_size
+            )
+            totals[kind] = 0
+            for row in rows:
+                record = {
+                    "type": kind,
+                    **{field.replace("__username", "").replace(
+                        "__slug", ""): value
+                       for field, value in row.items()},
+                }
+                file.write(dumps(record) + "\n")
+                totals[kind] += 1
+        return totals
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import comment_queue
+
+
+class Command(BaseCommand):
+    help = "Сохраняет комментарии из очереди отложенной записи"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=float, default=0,
+            help="Повторять каждые N секунд (по умолчанию один раз)",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            flushed = comment_queue.flush(options["batch_size"])
+            if flushed or not options["interval"]:
+                self.stdout.write(f"Сохранено комментариев: {flushed}")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,160 @@
+import sys
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from posts import cache_versions as versions
+from posts.jsonl import read_records
+from posts.models import Comment, Follow, Group, Post
+from posts.utils import keep_dates
+
+User = get_user_model()
+
+KINDS = ("user", "group", "post", "comment", "follow")
+
+
+class Command(BaseCommand):
+    help = "Загружает данные из JSONL, созданного командой export_posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Файл JSONL или - для stdin")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--workers", type=int, default=0,
+            help="Процессов для разбора JSON (0 - в текущем процессе)",
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = min(options["batch_size"], 500)
+        self.pending = {kind: [] for kind in KINDS}
+        self.created = dict.fromkeys(KINDS, 0)
+        self.skipped = 0
+        self.post_ids = {}
+        self.next_post_id = (
+            Post.objects.aggregate(last=Max("id"))["last"] or 0
+        )
+        if options["path"] == "-":
+            self.load(sys.stdin, options["workers"])
+        else:
+            with open(options["path"], encoding="utf-8") as file:
+                self.load(file, options["workers"])
+        for command in ("reconcile_counters", "rebuild_timeline",
+                        "rebuild_search_index", "migrate_images"):
+            call_command(command, stdout=StringIO(), stderr=StringIO())
+        # Импорт обходит сигналы, поэтому версии фрагментов и страниц
+        # сбрасываются здесь, в общем для процессов кеше.
+        versions.bump_all()
+        self.stdout.write(", ".join(
+            f"{kind}: {count}" for kind, count in self.created.items()
+        ) + f", пропущено: {self.skipped}")
+
+    def load(self, file, workers):
+        with transaction.atomic(), keep_dates(Post, Comment):
+            for record in read_records(file, workers, self.batch_size):
+                kind = record.pop("type", None)
+                if kind not in self.pending:
+                    raise CommandError(f"Неизвестный тип записи: {kind}")
+                self.pending[kind].append(record)
+                if len(self.pending[kind]) >= self.batch_size:
+                    self.flush(kind)
+            self.flush(KINDS[-1])
+            sequences = connection.ops.sequence_reset_sql(
+                no_style(), [Post, Comment]
+            )
+            with connection.cursor() as cursor:
+                for sql in sequences:
+                    cursor.execute(sql)
+
+    def flush(self, kind):
+        # Записи ссылаются на объекты предыдущих типов, поэтому сначала
+        # сохраняются накопленные пачки этих типов.
+        for current in KINDS[:KINDS.index(kind) + 1]:
+            records = self.pending[current]
+            if records:
+                getattr(self, f"import_{current}s")(records)
+                self.pending[current] = []
+
+    def user_ids(self, *usernames):
+        return dict(User.objects.filter(
+            username__in={name for name in usernames if name}
+        ).values_list("username", "id"))
+
+    def import_users(self, records):
+        existing = self.user_ids(*(r["username"] for r in records))
+        password = make_password(None)
+        users = User.objects.bulk_create(
+            User(username=r["username"], first_name=r["first_name"],
+                 last_name=r["last_name"], email=r["email"],
+                 date_joined=parse_datetime(r["date_joined"]),
+                 password=password)
+            for r in records if r["username"] not in existing
+        )
+        self.created["user"] += len(users)
+
+    def import_groups(self, records):
+        existing = set(Group.objects.filter(
+            slug__in=[r["slug"] for r in records]
+        ).values_list("slug", flat=True))
+        groups = Group.objects.bulk_create(
+            Group(slug=r["slug"], title=r["title"],
+                  description=r["description"])
+            for r in records if r["slug"] not in existing
+        )
+        self.created["group"] += len(groups)
+
+    def import_posts(self, records):
+        authors = self.user_ids(*(r["author"] for r in records))
+        groups = dict(Group.objects.filter(
+            slug__in={r["group"] for r in records if r["group"]}
+        ).values_list("slug", "id"))
+        posts = []
+        for r in records:
+            if r["author"] not in authors:
+                self.skipped += 1
+                continue
+            self.next_post_id += 1
+            self.post_ids[r["id"]] = self.next_post_id
+            posts.append(Post(
+                id=self.next_post_id, text=r["text"],
+                pub_date=parse_datetime(r["pub_date"]),
+                author_id=authors[r["author"]],
+                group_id=groups.get(r["group"]),
+                image=r["image"] or "",
+            ))
+        self.created["post"] += len(Post.objects.bulk_create(posts))
+
+    def import_comments(self, records):
+        authors = self.user_ids(*(r["author"] for r in records))
+        comments = []
+        for r in records:
+            post_id = self.post_ids.get(r["post_id"])
+            if post_id is None or r["author"] not in authors:
+                self.skipped += 1
+                continue
+            created = parse_datetime(r["created"])
+            comments.append(Comment(
+                post_id=post_id, author_id=authors[r["author"]],
+                text=r["text"], created=created, pub_date=created,
+            ))
+        self.created["comment"] += len(Comment.objects.bulk_create(comments))
+
+    def import_follows(self, records):
+        users = self.user_ids(
+            *(r["user"] for r in records), *(r["author"] for r in records)
+        )
+        follows = [
+            Follow(user_id=users[r["user"]], author_id=users[r["author"]])
+            for r in records
+            if r["user"] in users and r["author"] in users
+            and r["user"] != r["author"]
+        ]
+        self.skipped += len(records) - len(follows)
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
+        self.created["follow"] += len(follows)
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from posts import cache_versions as versions
+from posts import images
+from posts.models import Post, StoredImage
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит картинки постов в хранилище с адресацией по содержимому "
+        "и пересчитывает ссылки на файлы"
+    )
+
+    def handle(self, *args, **options):
+        storage = images.storage()
+        names = Post.objects.exclude(image="").values_list(
+            "image", flat=True
+        ).order_by().distinct()
+        moved = []
+        missing = 0
+        for name in list(names):
+            if storage.is_addressed(name):
+                continue
+            if not storage.exists(name):
+                self.stderr.write(f"Нет файла: {name}")
+                missing += 1
+                continue
+            with storage.open(name) as file:
+                new_name = storage.save(name, file)
+            Post.objects.filter(image=name).update(
+                image=new_name, updated_at=timezone.now()
+            )
+            moved.append(name)
+        with transaction.atomic():
+            StoredImage.objects.all().delete()
+            StoredImage.objects.bulk_create(
+                StoredImage(name=name, refs=refs)
+                for name, refs in Post.objects.exclude(image="").values_list(
+                    "image"
+                ).annotate(refs=Count("id")).order_by()
+            )
+        if moved:
+            # В закешированных страницах остались адреса старых файлов:
+            # версии сбрасываются до их удаления.
+            versions.bump_all()
+        for name in moved:
+            storage.delete(name)
+        self.stdout.write(
+            f"Перенесено файлов: {len(moved)}, не найдено: {missing}"
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.middleware import hit_ratio
+
+
+class Command(BaseCommand):
+    help = "Показывает долю попаданий в кеш страниц по всем процессам"
+
+    def handle(self, *args, **options):
+        hits, misses, ratio = hit_ratio()
+        self.stdout.write(
+            f"Попаданий: {hits}, промахов: {misses}, доля: {ratio:.1%}"
+        )
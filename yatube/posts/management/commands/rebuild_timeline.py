@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import timeline
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Перестраивает материализованные ленты подписок"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "usernames", nargs="*",
+            help="Пользователи, чьи ленты нужно перестроить "
+                 "(по умолчанию все)",
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(follower__isnull=False).distinct()
+        if options["usernames"]:
+            users = User.objects.filter(username__in=options["usernames"])
+        rebuilt = 0
+        for user_id in users.values_list("id", flat=True).iterator():
+            with transaction.atomic():
+                timeline.rebuild(user_id)
+            rebuilt += 1
+        self.stdout.write(f"Перестроено лент: {rebuilt}")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import counters, group_stats
+
+
+class Command(BaseCommand):
+    help = "Сверяет денормализованные счётчики с реальными данными"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            users, posts = counters.reconcile()
+            groups = group_stats.reconcile()
+        self.stdout.write(
+            f"Исправлено счётчиков пользователей: {users}, постов: {posts}, "
+            f"сообществ: {groups}"
+        )
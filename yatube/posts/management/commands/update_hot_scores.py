@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import hot
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает рейтинг популярных постов по новым комментариям"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=float, default=0,
+            help="Повторять каждые N секунд (по умолчанию один раз)",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--rebuild", action="store_true",
+            help="Посчитать заново, например после смены HOT_HALF_LIFE",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            counted = hot.rebuild()
+            self.stdout.write(f"Учтено комментариев: {counted}")
+            return
+        while True:
+            counted = hot.update(options["batch_size"])
+            if counted or not options["interval"]:
+                self.stdout.write(f"Учтено комментариев: {counted}")
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
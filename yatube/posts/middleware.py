@@ -0,0 +1,111 @@
+import gzip
+
+from django.conf import settings as st
+from django.core.cache import cache, caches
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import (
+    get_conditional_response, patch_vary_headers,
+)
+from django.utils.http import parse_http_date_safe
+
+from . import cache_versions as versions
+
+HITS_KEY = "page_cache:hits"
+MISSES_KEY = "page_cache:misses"
+STORED_HEADERS = ("Cache-Control", "Content-Type", "ETag", "Last-Modified",
+                  "Vary", "X-Frame-Options", "X-Content-Type-Options")
+
+
+def count(key):
+    # Счётчики лежат в общем для процессов кеше версий, иначе
+    # page_cache_stats видел бы только собственный пустой кеш.
+    # incr в файловом кеше не атомарен: при гонке шаг может потеряться.
+    counters = caches[versions.CACHE_ALIAS]
+    counters.add(key, 0, None)
+    try:
+        counters.incr(key)
+    except ValueError:
+        pass
+
+
+def hit_ratio():
+    counters = caches[versions.CACHE_ALIAS]
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return hits, misses, hits / total if total else 0.0
+
+
+class PageCacheMiddleware:
+    """Кеширует целые страницы для анонимов в сжатом виде.
+
+    Запись хранит версии ключей, прочитанные при её построении;
+    сигналы сбрасывают эти версии, и запись перестаёт совпадать.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def cache_key(self, request):
+        if request.method != "GET" or not st.PAGE_CACHE_TTL:
+            return None
+        if st.SESSION_COOKIE_NAME in request.COOKIES:
+            return None
+        if set(request.GET) - {"page"}:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.view_name not in st.PAGE_CACHE_VIEWS:
+            return None
+        request.resolver_match = match
+        return "page:{}:{}".format(request.path, request.GET.get("page", ""))
+
+    def __call__(self, request):
+        key = self.cache_key(request)
+        if key is None:
+            return self.get_response(request)
+        entry = cache.get(key)
+        if entry is not None:
+            observed, headers, body = entry
+            if versions.unchanged(observed):
+                count(HITS_KEY)
+                return self.cached_response(request, headers, body)
+        count(MISSES_KEY)
+        with versions.observe() as observed:
+            response = self.get_response(request)
+        if (response.status_code == 200 and not response.streaming
+                and not response.cookies and observed
+                and not getattr(request, "replica_fell_back", False)):
+            headers = {name: response[name] for name in STORED_HEADERS
+                       if response.has_header(name)}
+            cache.set(key, (observed, headers, gzip.compress(
+                response.content
+            )), st.PAGE_CACHE_TTL)
+        response["X-Page-Cache"] = "MISS"
+        return response
+
+    def cached_response(self, request, headers, body):
+        response = HttpResponse()
+        for name, value in headers.items():
+            response[name] = value
+        conditional = get_conditional_response(
+            request,
+            etag=headers.get("ETag"),
+            last_modified=parse_http_date_safe(
+                headers.get("Last-Modified", "")
+            ),
+            response=response,
+        )
+        if conditional is not response:
+            return conditional
+        if "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", ""):
+            response.content = body
+            response["Content-Encoding"] = "gzip"
+        else:
+            response.content = gzip.decompress(body)
+        patch_vary_headers(response, ("Accept-Encoding",))
+        response["X-Page-Cache"] = "HIT"
+        return response
@@ -4,6 +4,8 @@ from django.db import models
 from core.models import CreatedModel
 from django.db.models import UniqueConstraint
 
+from .storage import ContentAddressedStorage
+
 User = get_user_model()
 
 
@@ -13,6 +15,9 @@ class Group(models.Model):
     description = models.TextField("Описание")
 
     class Meta:
+        indexes = [
+            models.Index(fields=["title"], name="group_title"),
+        ]
         verbose_name = "Сообщество"
         verbose_name_plural = "Сообщества"
 
@@ -41,17 +46,44 @@ class Post(CreatedModel):
     image = models.ImageField(
         "Картинка",
         upload_to="posts/",
+        storage=ContentAddressedStorage(),
         blank=True,
     )
+    comment_count = models.PositiveIntegerField(
+        "Комментариев",
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         ordering = ("-pub_date",)
+        indexes = [
+            models.Index(fields=["pub_date"], name="post_pub_date"),
+            models.Index(fields=["group", "pub_date"],
+                         name="post_group_pub_date"
+                         ),
+            models.Index(fields=["author", "pub_date"],
+                         name="post_author_pub_date"
+                         ),
+        ]
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
 
     def __str__(self):
         return self.text[st.PAGE_LIMIT:]
 
+    def save(self, *args, **kwargs):
+        # Счётчик меняется только через F() в counters.change_comments:
+        # обычное сохранение записало бы загруженное ранее значение поверх
+        # параллельных изменений.
+        if (not self._state.adding and kwargs.get("update_fields") is None
+                and not kwargs.get("force_insert")):
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "comment_count"
+            ]
+        super().save(*args, **kwargs)
+
 
 class Comment(CreatedModel):
     post = models.ForeignKey(Post, related_name="comment",
@@ -64,6 +96,17 @@ class Comment(CreatedModel):
                                )
     text = models.TextField("Текст комментария", max_length=50)
     created = models.DateTimeField("Дата", auto_now_add=True)
+    # Ключ записи в очереди отложенной записи (posts.comment_queue):
+    # повторный сброс той же очереди не создаёт дублей.
+    spool_id = models.UUIDField("Ключ в очереди", null=True, blank=True,
+                                unique=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["post", "created"],
+                         name="comment_post_created"
+                         ),
+        ]
 
     def __str__(self):
         return self.text[0:st.PAGE_LIMIT]
@@ -85,4 +128,149 @@ class Follow(models.Model):
                              name='following_followers'
                              )
         ]
+        indexes = [
+            models.Index(fields=["author", "user"],
+                         name="follow_author_user"
+                         ),
+        ]
         verbose_name = "followers"
+
+
+class Counters(models.Model):
+    user = models.OneToOneField(User, primary_key=True,
+                                related_name="counters",
+                                verbose_name="Пользователь",
+                                on_delete=models.CASCADE
+                                )
+    posts_count = models.PositiveIntegerField("Постов", default=0)
+    followers_count = models.PositiveIntegerField("Подписчиков", default=0)
+    following_count = models.PositiveIntegerField("Подписок", default=0)
+
+    class Meta:
+        verbose_name = "Счётчики пользователя"
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(User, related_name="timeline",
+                             verbose_name="Читатель",
+                             on_delete=models.CASCADE
+                             )
+    post = models.ForeignKey(Post, related_name="timeline_entries",
+                             verbose_name="Пост",
+                             on_delete=models.CASCADE
+                             )
+    author = models.ForeignKey(User, related_name="+",
+                               verbose_name="Автор",
+                               on_delete=models.CASCADE
+                               )
+    pub_date = models.DateTimeField("Дата")
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["user", "post"],
+                             name="timeline_user_post"
+                             )
+        ]
+        indexes = [
+            models.Index(fields=["user", "pub_date"],
+                         name="timeline_user_pub_date"
+                         ),
+            models.Index(fields=["user", "author"],
+                         name="timeline_user_author"
+                         ),
+        ]
+        verbose_name = "Лента подписок"
+
+
+class PostRendition(models.Model):
+    post = models.ForeignKey(Post, related_name="renditions",
+                             verbose_name="Пост",
+                             on_delete=models.CASCADE
+                             )
+    name = models.CharField("Файл", max_length=255)
+    width = models.PositiveIntegerField("Ширина")
+    height = models.PositiveIntegerField("Высота")
+    format = models.CharField("Формат", max_length=10)
+
+    class Meta:
+        ordering = ("format", "width")
+        indexes = [
+            models.Index(fields=["post", "format", "width"],
+                         name="rendition_post_format_width"
+                         ),
+        ]
+        verbose_name = "Превью картинки"
+
+    @property
+    def url(self):
+        return Post._meta.get_field("image").storage.url(self.name)
+
+
+class StoredImage(models.Model):
+    name = models.CharField("Файл", max_length=255, primary_key=True)
+    refs = models.PositiveIntegerField("Ссылок", default=0)
+
+    class Meta:
+        verbose_name = "Файл картинки"
+        verbose_name_plural = "Файлы картинок"
+
+
+class PostScore(models.Model):
+    post = models.OneToOneField(Post, primary_key=True,
+                                related_name="hot_score",
+                                verbose_name="Пост",
+                                on_delete=models.CASCADE
+                                )
+    # Логарифм суммы весов комментариев, см. posts.hot.
+    score = models.FloatField("Рейтинг")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["score"], name="post_score_score"),
+        ]
+        verbose_name = "Рейтинг поста"
+        verbose_name_plural = "Рейтинги постов"
+
+
+class HotCheckpoint(models.Model):
+    last_comment_id = models.PositiveIntegerField(
+        "Последний учтённый комментарий", default=0
+    )
+
+    class Meta:
+        verbose_name = "Позиция пересчёта рейтинга"
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(Group, primary_key=True,
+                                 related_name="stats",
+                                 verbose_name="Сообщество",
+                                 on_delete=models.CASCADE
+                                 )
+    posts_count = models.PositiveIntegerField("Постов", default=0)
+    authors_count = models.PositiveIntegerField("Авторов", default=0)
+    last_pub_date = models.DateTimeField("Последний пост", null=True,
+                                         blank=True)
+
+    class Meta:
+        verbose_name = "Статистика сообщества"
+
+
+class GroupAuthorStats(models.Model):
+    group = models.ForeignKey(Group, related_name="author_stats",
+                              verbose_name="Сообщество",
+                              on_delete=models.CASCADE
+                              )
+    author = models.ForeignKey(User, related_name="+",
+                               verbose_name="Автор",
+                               on_delete=models.CASCADE
+                               )
+    posts_count = models.PositiveIntegerField("Постов", default=0)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["group", "author"],
+                             name="group_author_stats"
+                             )
+        ]
+        verbose_name = "Статистика автора в сообществе"
@@ -0,0 +1,108 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings as st
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import cache_versions as versions
+from .imaging import make_renditions
+from .models import Post, PostRendition
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=st.THUMBNAIL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _arguments(post):
+    prefix = os.path.join(
+        "renditions", str(post.pk),
+        os.path.splitext(os.path.basename(post.image.name))[0],
+    )
+    return (
+        post.image.path, st.MEDIA_ROOT, prefix,
+        st.POST_IMAGE_SIZES, st.POST_IMAGE_FORMATS,
+    )
+
+
+def _delete_files(names):
+    for name in names:
+        try:
+            os.remove(os.path.join(st.MEDIA_ROOT, name))
+        except FileNotFoundError:
+            pass
+
+
+def _replace(post, renditions=()):
+    kept = {name for name, *_ in renditions}
+    stale = PostRendition.objects.filter(post=post)
+    superseded = set(stale.values_list("name", flat=True)) - kept
+    stale.delete()
+    # Файлы удаляются только после фиксации: при откате строки
+    # со старыми именами вернутся, и превью должны остаться на диске.
+    transaction.on_commit(partial(_delete_files, superseded))
+
+
+def store(post_id, source_name, renditions):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or post.image.name != source_name:
+        return
+    with transaction.atomic():
+        _replace(post, renditions)
+        PostRendition.objects.bulk_create(
+            PostRendition(post=post, name=name, width=width,
+                          height=height, format=fmt)
+            for name, width, height, fmt in renditions
+        )
+        Post.objects.filter(pk=post.pk).update(updated_at=timezone.now())
+    versions.bump_post(post)
+
+
+def _stored(post_id, source_name, future):
+    try:
+        store(post_id, source_name, future.result())
+    except Exception:
+        logger.exception("Не удалось подготовить превью поста %s", post_id)
+    finally:
+        close_old_connections()
+
+
+def generate(post):
+    if not post.image:
+        with transaction.atomic():
+            _replace(post)
+        return
+    arguments = _arguments(post)
+    if not st.THUMBNAIL_WORKERS:
+        try:
+            store(post.pk, post.image.name, make_renditions(*arguments))
+        except OSError:
+            logger.exception("Не удалось подготовить превью поста %s",
+                             post.pk)
+        return
+    future = get_executor().submit(make_renditions, *arguments)
+    future.add_done_callback(partial(_stored, post.pk, post.image.name))
+    return future
+
+
+def schedule(post):
+    if st.BACKGROUND_TASKS and post.image:
+        from .tasks import generate_renditions
+
+        # Задача сохраняется в той же транзакции, что и пост.
+        generate_renditions.delay(post.pk, post.image.name)
+        return
+    transaction.on_commit(partial(generate, post))
@@ -0,0 +1,143 @@
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+from .stemmer import WORD_RE, stem, stem_text
+
+TABLE = "posts_post_fts"
+
+
+def is_supported():
+    return connection.vendor == "sqlite"
+
+
+def ensure_index(using=DEFAULT_DB_ALIAS):
+    if connections[using].vendor != "sqlite":
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+            "text, author, group_title, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def _document(post):
+    author = post.author
+    return (
+        post.pk,
+        stem_text(post.text),
+        stem_text(f"{author.username} {author.get_full_name()}"),
+        stem_text(post.group.title) if post.group_id else "",
+    )
+
+
+def index_posts(posts):
+    if not is_supported():
+        return
+    documents = [_document(post) for post in posts]
+    # Не больше 999 параметров на запрос, по 4 на документ.
+    for start in range(0, len(documents), 200):
+        chunk = documents[start:start + 200]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {TABLE} WHERE rowid IN "
+                f"({', '.join(['%s'] * len(chunk))})",
+                [document[0] for document in chunk],
+            )
+            cursor.execute(
+                f"INSERT INTO {TABLE} (rowid, text, author, group_title) "
+                f"VALUES {', '.join(['(%s, %s, %s, %s)'] * len(chunk))}",
+                [value for document in chunk for value in document],
+            )
+
+
+def unindex_post(post_id):
+    if not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [post_id])
+
+
+def reindex(posts, batch_size=1000):
+    """Переиндексирует выборку постов частями, не загружая её целиком."""
+    if not is_supported():
+        return 0
+    posts = posts.select_related("author", "group").order_by()
+    batch = []
+    total = 0
+    for post in posts.iterator(chunk_size=batch_size):
+        batch.append(post)
+        if len(batch) == batch_size:
+            index_posts(batch)
+            total += len(batch)
+            batch = []
+    index_posts(batch)
+    return total + len(batch)
+
+
+def rebuild(batch_size=1000):
+    if not is_supported():
+        return 0
+    ensure_index()
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+    return reindex(Post.objects.all(), batch_size)
+
+
+def match_expression(query):
+    terms = [stem(word) for word in WORD_RE.findall(query)]
+    return " ".join(f'"{term}"*' for term in terms if term)
+
+
+def matching_ids(query):
+    return RawSQL(
+        f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s",
+        (match_expression(query),),
+    )
+
+
+class SearchResults:
+    """Ленивая выборка для Paginator: считает и режет результаты в FTS."""
+
+    def __init__(self, query):
+        self.expression = match_expression(query)
+
+    def count(self):
+        if not self.expression:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT count(*) FROM {TABLE} WHERE {TABLE} MATCH %s",
+                [self.expression],
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.expression:
+            return []
+        start = index.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s "
+                f"ORDER BY bm25({TABLE}, 1.0, 0.5, 0.5) LIMIT %s OFFSET %s",
+                [self.expression, index.stop - start, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = Post.objects.select_related(
+            "author", "group"
+        ).prefetch_related("renditions").in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search(query):
+    if is_supported():
+        return SearchResults(query)
+    return Post.objects.filter(text__icontains=query).select_related(
+        "author", "group"
+    )
@@ -0,0 +1,160 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cache_versions as versions
+from . import counters, graph, group_stats, images, search, timeline
+from .models import Comment, Follow, Group, GroupStats, Post, User
+
+
+def create_search_index(sender, using, **kwargs):
+    search.ensure_index(using)
+
+
+def reset_follower_graph(sender, **kwargs):
+    graph.reset()
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, **kwargs):
+    instance._previous_group_id = None
+    instance._previous_image = ""
+    if not instance._state.adding:
+        previous = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list("group_id", "image").first()
+        )
+        if previous:
+            instance._previous_group_id, instance._previous_image = previous
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    previous_group_id = getattr(instance, "_previous_group_id", None)
+    if created:
+        counters.change(instance.author_id, posts_count=1)
+        timeline.fan_out(instance)
+        group_stats.change(instance.group_id, instance.author_id, 1,
+                           instance.pub_date)
+    elif previous_group_id != instance.group_id:
+        group_stats.change(previous_group_id, instance.author_id, -1,
+                           instance.pub_date)
+        group_stats.change(instance.group_id, instance.author_id, 1,
+                           instance.pub_date)
+    images.replace(getattr(instance, "_previous_image", ""),
+                   instance.image.name or "")
+    search.index_posts([instance])
+    versions.bump_post(instance, previous_group_id)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change(instance.author_id, posts_count=-1)
+    group_stats.change(instance.group_id, instance.author_id, -1,
+                       instance.pub_date)
+    images.release(instance.image.name)
+    search.unindex_post(instance.pk)
+    versions.bump_post(instance)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+    else:
+        search.reindex(instance.posts.all())
+    versions.bump(
+        versions.version_key(versions.FEED),
+        versions.version_key(versions.GROUP, instance.pk),
+    )
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    versions.bump(
+        versions.version_key(versions.FEED),
+        versions.version_key(versions.GROUP, instance.pk),
+    )
+
+
+def _card_fields(user):
+    return user.username, user.first_name, user.last_name
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, update_fields=None, **kwargs):
+    instance._previous_card_fields = None
+    if not instance._state.adding and update_fields != {"last_login"}:
+        instance._previous_card_fields = (
+            User.objects.filter(pk=instance.pk)
+            .values_list("username", "first_name", "last_name").first()
+        )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {"last_login"}:
+        return
+    previous = getattr(instance, "_previous_card_fields", None)
+    keys = [versions.version_key(versions.AUTHOR, instance.pk)]
+    if previous and previous != _card_fields(instance):
+        # Имя автора выводится в карточках его постов и в лентах.
+        posts = Post.objects.filter(author=instance)
+        posts.update(updated_at=timezone.now())
+        # Имя автора проиндексировано вместе с текстом постов.
+        search.reindex(posts)
+        group_ids = posts.exclude(group=None).values_list(
+            "group_id", flat=True
+        ).order_by().distinct()
+        follower_ids = instance.following.values_list("user_id", flat=True)
+        keys += [
+            versions.version_key(versions.FEED),
+            *(versions.version_key(versions.GROUP, pk) for pk in group_ids),
+            *(versions.version_key(versions.FOLLOW, pk)
+              for pk in follower_ids),
+        ]
+    versions.bump(*keys)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    versions.bump(versions.version_key(versions.AUTHOR, instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.change_comments(instance.post_id, 1)
+    versions.bump(versions.version_key(versions.POST, instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change_comments(instance.post_id, -1)
+    versions.bump(versions.version_key(versions.POST, instance.post_id))
+
+
+def bump_follow(follow):
+    versions.bump(
+        versions.version_key(versions.FOLLOW, follow.user_id),
+        versions.version_key(versions.AUTHOR, follow.author_id),
+    )
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.change(instance.user_id, following_count=1)
+        counters.change(instance.author_id, followers_count=1)
+        timeline.add_author(instance.user_id, instance.author_id)
+        graph.record(instance, added=True)
+    bump_follow(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.change(instance.user_id, following_count=-1)
+    counters.change(instance.author_id, followers_count=-1)
+    timeline.remove_author(instance.user_id, instance.author_id)
+    graph.record(instance, added=False)
+    bump_follow(instance)
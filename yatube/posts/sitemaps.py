@@ -0,0 +1,72 @@
+from xml.sax.saxutils import escape
+
+from django.conf import settings as st
+from django.db.models import Max
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+
+from .freshness import index_state, public, shard_range, shard_state
+from .models import Post
+
+CONTENT_TYPE = "application/xml; charset=utf-8"
+URLSET = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+          '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+SITEMAPINDEX = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<sitemapindex '
+                'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+
+
+def shard_count():
+    # Посты делятся на части по диапазонам id: адрес части не меняется,
+    # а её строки читаются по первичному ключу.
+    last_pk = Post.objects.order_by().aggregate(last=Max("pk"))["last"]
+    return -(-(last_pk or 0) // st.SITEMAP_SHARD_SIZE)
+
+
+def _index_lines(base, shards):
+    yield SITEMAPINDEX
+    for shard in range(1, shards + 1):
+        loc = base + reverse("posts:sitemap_shard", kwargs={"shard": shard})
+        yield f"<sitemap><loc>{escape(loc)}</loc></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def _url_lines(base, shard):
+    first, last = shard_range(shard)
+    rows = Post.objects.filter(pk__gte=first, pk__lte=last).order_by(
+        "pk"
+    ).values_list("pk", "updated_at").iterator(chunk_size=st.SITEMAP_CHUNK)
+    yield URLSET
+    chunk = []
+    for pk, updated_at in rows:
+        loc = base + reverse("posts:post_detail", kwargs={"post_id": pk})
+        chunk.append(
+            f"<url><loc>{escape(loc)}</loc>"
+            f"<lastmod>{updated_at.isoformat(timespec='seconds')}</lastmod>"
+            "</url>\n"
+        )
+        if len(chunk) >= st.SITEMAP_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+    chunk.append("</urlset>\n")
+    yield "".join(chunk)
+
+
+def _base(request):
+    return request.build_absolute_uri("/")[:-1]
+
+
+@public(index_state)
+def sitemap_index(request):
+    return StreamingHttpResponse(
+        _index_lines(_base(request), shard_count()),
+        content_type=CONTENT_TYPE,
+    )
+
+
+@public(shard_state)
+def sitemap_shard(request, shard):
+    if not 1 <= shard <= shard_count():
+        raise Http404("Нет такой части карты сайта")
+    return StreamingHttpResponse(_url_lines(_base(request), shard),
+                                 content_type=CONTENT_TYPE)
@@ -0,0 +1,113 @@
+import re
+
+# Упрощённая реализация стеммера Snowball для русского языка:
+# FTS5 из коробки умеет только английский porter.
+VOWELS = "аеиоуыэюя"
+WORD_RE = re.compile(r"\w+")
+
+
+def _suffixes(after_a, other=()):
+    items = [(ending, True) for ending in after_a]
+    items += [(ending, False) for ending in other]
+    return sorted(items, key=lambda item: -len(item[0]))
+
+
+PERFECTIVE_GERUND = _suffixes(
+    ("в", "вши", "вшись"),
+    ("ив", "ивши", "ившись", "ыв", "ывши", "ывшись"),
+)
+ADJECTIVE = _suffixes((), (
+    "ее", "ие", "ые", "ое", "ими", "ыми", "ей", "ий", "ый", "ой", "ем",
+    "им", "ым", "ом", "его", "ого", "ему", "ому", "их", "ых", "ую", "юю",
+    "ая", "яя", "ою", "ею",
+))
+PARTICIPLE = _suffixes(("ем", "нн", "вш", "ющ", "щ"), ("ивш", "ывш", "ующ"))
+REFLEXIVE = _suffixes((), ("ся", "сь"))
+VERB = _suffixes(
+    ("ла", "на", "ете", "йте", "ли", "й", "л", "ем", "н", "ло", "но", "ет",
+     "ют", "ны", "ть", "ешь", "нно"),
+    ("ила", "ыла", "ена", "ейте", "уйте", "ите", "или", "ыли", "ей", "уй",
+     "ил", "ыл", "им", "ым", "ен", "ило", "ыло", "ено", "ят", "ует", "уют",
+     "ит", "ыт", "ены", "ить", "ыть", "ишь", "ую", "ю"),
+)
+NOUN = _suffixes((), (
+    "а", "ев", "ов", "ие", "ье", "е", "иями", "ями", "ами", "еи", "ии", "и",
+    "ией", "ей", "ой", "ий", "й", "иям", "ям", "ием", "ем", "ам", "ом", "о",
+    "у", "ах", "иях", "ях", "ы", "ь", "ию", "ью", "ю", "ия", "ья", "я",
+))
+DERIVATIONAL = ("ость", "ост")
+SUPERLATIVE = ("ейше", "ейш")
+
+
+def _remove(word, suffixes):
+    for ending, after_a in suffixes:
+        if word.endswith(ending):
+            stem = word[:-len(ending)]
+            if after_a and not stem.endswith(("а", "я")):
+                return None
+            return stem
+    return None
+
+
+def _region(word, start=0):
+    for index in range(start + 1, len(word)):
+        if word[index - 1] in VOWELS and word[index] not in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def _strip_ending(rv):
+    # Шаг 1: деепричастие, иначе возвратность и прилагательное
+    # (с причастием), глагол или существительное.
+    result = _remove(rv, PERFECTIVE_GERUND)
+    if result is not None:
+        return result
+    unreflexive = _remove(rv, REFLEXIVE)
+    if unreflexive is not None:
+        rv = unreflexive
+    result = _remove(rv, ADJECTIVE)
+    if result is not None:
+        participle = _remove(result, PARTICIPLE)
+        return result if participle is None else participle
+    result = _remove(rv, VERB)
+    if result is None:
+        result = _remove(rv, NOUN)
+    return rv if result is None else result
+
+
+def _strip_derivational(rv, offset, r2):
+    for ending in DERIVATIONAL:
+        if rv.endswith(ending) and offset + len(rv) - len(ending) >= r2:
+            return rv[:-len(ending)]
+    return rv
+
+
+def _tidy(rv):
+    for ending in SUPERLATIVE:
+        if rv.endswith(ending):
+            rv = rv[:-len(ending)]
+            break
+    if rv.endswith(("нн", "ь")):
+        rv = rv[:-1]
+    return rv
+
+
+def stem(word):
+    word = word.lower().replace("ё", "е")
+    for index, char in enumerate(word):
+        if char in VOWELS:
+            break
+    else:
+        return word
+    prefix, rv = word[:index + 1], word[index + 1:]
+    r2 = _region(word, _region(word))
+
+    rv = _strip_ending(rv)
+    if rv.endswith("и"):
+        rv = rv[:-1]
+    rv = _strip_derivational(rv, len(prefix), r2)
+    return prefix + _tidy(rv)
+
+
+def stem_text(text):
+    return " ".join(stem(word) for word in WORD_RE.findall(text))
@@ -0,0 +1,55 @@
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+ADDRESSED_RE = re.compile(r"/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+)?$")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит файл по SHA-256 содержимого: posts/ab/cd/abcd...ef.jpg.
+
+    Одинаковые загрузки сохраняются один раз, а файлы раскладываются по
+    каталогам по префиксу хеша. Хеш считается во время записи во
+    временный файл, поэтому загрузка читается один раз.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяет содержимое, совпадение означает тот же файл.
+        return name
+
+    def addressed_name(self, name, digest):
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            directory, digest[:2], digest[2:4], digest + extension
+        )
+
+    def is_addressed(self, name):
+        return bool(ADDRESSED_RE.search(name))
+
+    def _save(self, name, content):
+        tmp_dir = self.path("tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        handle, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(handle, "wb") as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            name = self.addressed_name(name, digest.hexdigest())
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                return name
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            os.replace(tmp_path, full_path)
+            return name
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
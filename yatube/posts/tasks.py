@@ -0,0 +1,14 @@
+from tasks.registry import task
+
+from . import renditions
+from .imaging import make_renditions
+from .models import Post
+
+
+@task(priority=10)
+def generate_renditions(post_id, source_name):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or post.image.name != source_name:
+        return
+    renditions.store(post_id, source_name,
+                     make_renditions(*renditions._arguments(post)))
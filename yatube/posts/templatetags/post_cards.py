@@ -0,0 +1,29 @@
+from django import template
+from django.conf import settings as st
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+CARD_TEMPLATE = "includes/post_list.html"
+
+
+def card_key(post):
+    return f"post_card:{post.pk}:{post.updated_at.timestamp()}"
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Пары (пост, HTML карточки); готовые карточки читаются одним get_many."""
+    posts = list(posts)
+    keys = [card_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    rendered = {
+        key: render_to_string(CARD_TEMPLATE, {"post": post})
+        for key, post in zip(keys, posts) if key not in cards
+    }
+    if rendered:
+        cache.set_many(rendered, st.FRAGMENT_CACHE_TTL)
+        cards.update(rendered)
+    return [(post, mark_safe(cards[key])) for key, post in zip(keys, posts)]
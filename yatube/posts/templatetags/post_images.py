@@ -0,0 +1,23 @@
+from django import template
+from django.conf import settings as st
+
+register = template.Library()
+
+
+@register.inclusion_tag("includes/post_image.html")
+def post_image(post):
+    srcsets = {}
+    fallback = None
+    for rendition in post.renditions.all():
+        srcsets.setdefault(rendition.format, []).append(
+            f"{rendition.url} {rendition.width}w"
+        )
+        if (rendition.format == "jpeg"
+                and rendition.width == st.POST_IMAGE_DEFAULT_WIDTH):
+            fallback = rendition
+    return {
+        "post": post,
+        "fallback": fallback,
+        "webp_srcset": ", ".join(srcsets.get("webp", ())),
+        "jpeg_srcset": ", ".join(srcsets.get("jpeg", ())),
+    }
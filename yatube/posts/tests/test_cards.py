@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post
+from posts.templatetags.post_cards import card_key, post_cards
+
+User = get_user_model()
+
+
+class PostCardsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(
+            username="card_author", first_name="Иван", last_name="Карточкин"
+        )
+        Post.objects.create(author=cls.author, text="Первая карточка")
+        Post.objects.create(author=cls.author, text="Вторая карточка")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cards_are_cached(self):
+        posts = list(Post.objects.select_related("author"))
+        post_cards(posts)
+        for post in posts:
+            self.assertIn(post.text, cache.get(card_key(post)))
+        with mock.patch("posts.templatetags.post_cards.render_to_string"
+                        ) as render, \
+                mock.patch.object(cache, "get_many",
+                                  wraps=cache.get_many) as get_many:
+            cards = post_cards(posts)
+        render.assert_not_called()
+        get_many.assert_called_once()
+        self.assertEqual([post for post, _ in cards], posts)
+
+    def test_edit_changes_card(self):
+        post = Post.objects.latest("pub_date")
+        old_key = card_key(post)
+        post.text = "Исправленная карточка"
+        post.save()
+        self.assertNotEqual(card_key(post), old_key)
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, "Исправленная карточка")
+
+    def test_author_rename_changes_cards(self):
+        self.client.get(reverse("posts:index"))
+        self.author.first_name = "Пётр"
+        self.author.save()
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, "Пётр Карточкин")
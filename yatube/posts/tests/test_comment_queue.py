@@ -0,0 +1,120 @@
+import fcntl
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import comment_queue
+from posts.models import Comment, Post
+
+User = get_user_model()
+SPOOL_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    COMMENT_WRITE_BEHIND=True,
+    COMMENT_SPOOL_PATH=os.path.join(SPOOL_DIR, "comments.jsonl"),
+)
+class WriteBehindCommentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username="queued_commenter")
+        cls.post = Post.objects.create(author=cls.user, text="Пост")
+        cls.url = reverse("posts:add_comment", kwargs={"post_id": cls.post.pk})
+        cls.detail = reverse("posts:post_detail",
+                             kwargs={"post_id": cls.post.pk})
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(SPOOL_DIR, ignore_errors=True)
+
+    def setUp(self):
+        for name in os.listdir(SPOOL_DIR):
+            os.remove(os.path.join(SPOOL_DIR, name))
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_comment_is_queued_and_visible_to_author(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.url, {"text": "В очереди"})
+        self.assertFalse([query for query in context.captured_queries
+                          if "posts_" in query["sql"]])
+        self.assertRedirects(response, self.detail)
+        self.assertFalse(Comment.objects.exists())
+        response = self.client.get(self.detail)
+        self.assertEqual([c["text"] for c in
+                          response.context["pending_comments"]],
+                         ["В очереди"])
+        other = Client()
+        response = other.get(self.detail)
+        self.assertEqual(response.context["pending_comments"], [])
+
+    def test_flush_inserts_batches(self):
+        for i in range(5):
+            self.client.post(self.url, {"text": f"Комментарий {i}"})
+        self.client.post(
+            reverse("posts:add_comment", kwargs={"post_id": 0}),
+            {"text": "К удалённому посту"},
+        )
+        out = StringIO()
+        call_command("flush_comments", batch_size=2, stdout=out)
+        self.assertIn(": 5", out.getvalue())
+        self.assertEqual(
+            list(self.post.comment.order_by("created").values_list(
+                "text", flat=True
+            )),
+            [f"Комментарий {i}" for i in range(5)],
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 5)
+        response = self.client.get(self.detail)
+        self.assertEqual(response.context["pending_comments"], [])
+        self.assertEqual(sorted(os.listdir(SPOOL_DIR)),
+                         ["comments.jsonl.flush.lock", "comments.jsonl.lock"])
+        self.assertEqual(comment_queue.flush(), 0)
+
+    def test_flush_after_crash_does_not_duplicate(self):
+        self.client.post(self.url, {"text": "Один раз"})
+        with mock.patch("posts.comment_queue.os.remove"):
+            self.assertEqual(comment_queue.flush(), 1)
+        self.assertEqual(comment_queue.flush(), 0)
+        self.assertEqual(self.post.comment.count(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_flush_is_exclusive(self):
+        self.client.post(self.url, {"text": "Один сброс"})
+        path = comment_queue.st.COMMENT_SPOOL_PATH + ".flush.lock"
+        store = comment_queue._store
+
+        def store_while_locked(batch):
+            with open(path) as lock:
+                with self.assertRaises(BlockingIOError):
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return store(batch)
+
+        with mock.patch("posts.comment_queue._store", store_while_locked):
+            self.assertEqual(comment_queue.flush(), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+    def test_truncated_line_is_quarantined(self):
+        self.client.post(self.url, {"text": "Целый"})
+        path = comment_queue.st.COMMENT_SPOOL_PATH
+        with open(path, "a", encoding="utf-8") as spool:
+            spool.write('{"post_id": 1, "tex')
+        with self.assertLogs("posts.comment_queue", "WARNING"):
+            self.assertEqual(comment_queue.flush(), 1)
+        with open(path + ".rejected", encoding="utf-8") as rejected:
+            self.assertEqual(rejected.read(), '{"post_id": 1, "tex\n')
+        self.assertEqual(comment_queue.flush(), 0)
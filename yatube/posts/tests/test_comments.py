@@ -0,0 +1,57 @@
+from django.conf import settings as st
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+class CommentPagesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username="commentator")
+        cls.post = Post.objects.create(author=cls.user, text="Обсуждаемый")
+        authors = [
+            User.objects.create(username=f"reader_{i}") for i in range(5)
+        ]
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=authors[i % 5],
+                    text=f"Комментарий {i}")
+            for i in range(st.COMMENT_LIMIT + 5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_post_detail_renders_first_comment_page(self):
+        response = self.client.get(
+            reverse("posts:post_detail", kwargs={"post_id": self.post.id})
+        )
+        comments = response.context["comments"]
+        self.assertEqual(len(comments), st.COMMENT_LIMIT)
+        self.assertEqual(comments[0].text, "Комментарий 0")
+        self.assertTrue(comments.has_next())
+        self.assertContains(response, "js-more-comments")
+
+    def test_fragment_serves_next_page_without_n_plus_one(self):
+        first = self.client.get(
+            reverse("posts:post_comments", kwargs={"post_id": self.post.id})
+        ).context["comments"]
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("posts:post_comments",
+                        kwargs={"post_id": self.post.id}),
+                {"cursor": first.next_cursor},
+            )
+        comments = response.context["comments"]
+        self.assertEqual([comment.text for comment in comments],
+                         [f"Комментарий {i}"
+                          for i in range(st.COMMENT_LIMIT,
+                                         st.COMMENT_LIMIT + 5)])
+        self.assertFalse(comments.has_next())
+        self.assertTemplateNotUsed(response, "base.html")
@@ -0,0 +1,49 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts import concurrent
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(VIEW_QUERY_WORKERS=2)
+class ConcurrentQueriesTests(TransactionTestCase):
+    def setUp(self):
+        concurrent._executor = None
+        self.author = User.objects.create(username="parallel_author")
+        self.reader = User.objects.create(username="parallel_reader")
+        self.post = Post.objects.create(author=self.author, text="Пост")
+        Comment.objects.create(
+            post=self.post, author=self.reader, text="Комментарий"
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+
+    def tearDown(self):
+        concurrent.get_executor().shutdown()
+        concurrent._executor = None
+
+    def test_gather_uses_pool(self):
+        names = concurrent.gather(
+            *(lambda: threading.current_thread().name for _ in range(3))
+        )
+        self.assertEqual(names[0], threading.current_thread().name)
+        self.assertTrue(all(name.startswith("view-query")
+                            for name in names[1:]))
+
+    def test_views(self):
+        response = self.client.get(
+            reverse("posts:profile", kwargs={"username": self.author})
+        )
+        self.assertTrue(response.context["following"])
+        self.assertEqual(response.context["counters"].posts_count, 1)
+        self.assertEqual(len(response.context["page_obj"]), 1)
+        response = self.client.get(
+            reverse("posts:post_detail", kwargs={"post_id": self.post.pk})
+        )
+        self.assertEqual(response.context["post_count"], 1)
+        self.assertEqual(len(response.context["comments"]), 1)
@@ -0,0 +1,93 @@
+from http import HTTPStatus as ht
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="fresh_author")
+        cls.reader = User.objects.create(username="fresh_reader")
+        cls.group = Group.objects.create(
+            title="Fresh group",
+            slug="fresh_group",
+            description="Fresh group",
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text="Свежий пост"
+        )
+        cls.urls = (
+            reverse("posts:post_detail", kwargs={"post_id": cls.post.pk}),
+            reverse("posts:profile", kwargs={"username": cls.author}),
+            reverse("posts:group_list", kwargs={"slug": cls.group.slug}),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def test_not_modified(self):
+        for client in (self.guest_client, self.authorized_client):
+            for url in self.urls:
+                with self.subTest(url=url):
+                    client.get(url)
+                    etag = client.get(url)["ETag"]
+                    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+                    self.assertEqual(response.status_code, ht.NOT_MODIFIED)
+
+    def test_etag_depends_on_viewer(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)["ETag"]
+                response = self.authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, ht.OK)
+
+    def test_edit_is_not_hidden_by_if_modified_since(self):
+        url = self.urls[0]
+        response = self.guest_client.get(url)
+        self.assertFalse(response.has_header("Last-Modified"))
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = "Исправленный пост"
+        post.save()
+        response = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date()
+        )
+        self.assertContains(response, "Исправленный пост")
+
+    def test_changes_invalidate(self):
+        for url in self.urls:
+            self.authorized_client.get(url)
+        etags = [self.authorized_client.get(url)["ETag"]
+                 for url in self.urls]
+        Comment.objects.create(
+            post=self.post, author=self.reader, text="Комментарий"
+        )
+        response = self.authorized_client.get(
+            self.urls[0], HTTP_IF_NONE_MATCH=etags[0]
+        )
+        self.assertEqual(response.status_code, ht.OK)
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = self.authorized_client.get(
+            self.urls[1], HTTP_IF_NONE_MATCH=etags[1]
+        )
+        self.assertEqual(response.status_code, ht.OK)
+        Post.objects.create(
+            author=self.reader, group=self.group, text="Ещё пост"
+        )
+        response = self.authorized_client.get(
+            self.urls[2], HTTP_IF_NONE_MATCH=etags[2]
+        )
+        self.assertEqual(response.status_code, ht.OK)
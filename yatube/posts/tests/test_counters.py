@@ -0,0 +1,89 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.counters import get_counters
+from posts.models import Comment, Counters, Follow, Post
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="counted_author")
+        cls.reader = User.objects.create(username="counted_reader")
+        cls.post = Post.objects.create(author=cls.author, text="Пост")
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_counters_follow_create_and_delete_paths(self):
+        author = get_counters(self.author)
+        reader = get_counters(self.reader)
+        self.assertEqual(author.posts_count, 1)
+        self.client.get(reverse("posts:profile_follow",
+                                kwargs={"username": self.author}))
+        Post.objects.create(author=self.author, text="Ещё пост")
+        author.refresh_from_db()
+        reader.refresh_from_db()
+        self.assertEqual(
+            (author.posts_count, author.followers_count), (2, 1)
+        )
+        self.assertEqual(reader.following_count, 1)
+        self.client.get(reverse("posts:profile_unfollow",
+                                kwargs={"username": self.author}))
+        author.refresh_from_db()
+        reader.refresh_from_db()
+        self.assertEqual(author.followers_count, 0)
+        self.assertEqual(reader.following_count, 0)
+
+    def test_comment_count(self):
+        self.client.post(
+            reverse("posts:add_comment", kwargs={"post_id": self.post.id}),
+            data={"text": "Комментарий"},
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+        Comment.objects.get(post=self.post).delete()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_post_save_keeps_concurrent_comment_count(self):
+        post = Post.objects.get(pk=self.post.pk)
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text="Комментарий")
+        post.text = "Исправленный пост"
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.comment_count, 1)
+
+    def test_profile_reads_counters(self):
+        get_counters(self.author)
+        response = self.client.get(reverse("posts:profile",
+                                           kwargs={"username": self.author}))
+        self.assertEqual(response.context["post_count"], 1)
+        self.assertContains(response, "Всего постов: 1")
+
+    def test_reconcile_counters_command(self):
+        get_counters(self.author)
+        Counters.objects.filter(user=self.author).update(posts_count=7)
+        Post.objects.filter(pk=self.post.pk).update(comment_count=3)
+        Follow.objects.bulk_create(
+            [Follow(user=self.reader, author=self.author)]
+        )
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        author = Counters.objects.get(user=self.author)
+        self.post.refresh_from_db()
+        self.assertEqual(
+            (author.posts_count, author.followers_count), (1, 1)
+        )
+        self.assertEqual(Counters.objects.get(user=self.reader)
+                         .following_count, 1)
+        self.assertEqual(self.post.comment_count, 0)
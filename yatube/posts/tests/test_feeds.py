@@ -0,0 +1,97 @@
+from http import HTTPStatus as ht
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="feed_author")
+        cls.group = Group.objects.create(title="Ленты", slug="feeds",
+                                         description="Про ленты")
+        cls.post = Post.objects.create(author=cls.author, group=cls.group,
+                                       text="Запись в ленте")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds(self):
+        urls = {
+            "posts:index_rss": {},
+            "posts:index_atom": {},
+            "posts:group_rss": {"slug": self.group.slug},
+            "posts:group_atom": {"slug": self.group.slug},
+            "posts:profile_rss": {"username": self.author.username},
+            "posts:profile_atom": {"username": self.author.username},
+        }
+        for name, kwargs in urls.items():
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, kwargs=kwargs))
+                self.assertContains(response, self.post.text)
+                self.assertContains(response, reverse(
+                    "posts:post_detail", kwargs={"post_id": self.post.pk}
+                ))
+                self.assertIn("max-age", response["Cache-Control"])
+        response = self.client.get(
+            reverse("posts:group_rss", kwargs={"slug": "missing"})
+        )
+        self.assertEqual(response.status_code, ht.NOT_FOUND)
+
+    def test_feed_validators_follow_posts(self):
+        url = reverse("posts:group_atom", kwargs={"slug": self.group.slug})
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+            ht.NOT_MODIFIED,
+        )
+        self.assertFalse(response.has_header("Last-Modified"))
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = "Исправленная запись"
+        post.save()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertContains(response, "Исправленная запись")
+        etag = response["ETag"]
+        Post.objects.create(author=self.author, group=self.group,
+                            text="Новая запись")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, ht.OK)
+        self.assertContains(response, "Новая запись")
+
+    @override_settings(SITEMAP_SHARD_SIZE=2, SITEMAP_CHUNK=1)
+    def test_sitemap_is_sharded_and_streamed(self):
+        posts = [self.post] + [
+            Post.objects.create(author=self.author, text=f"Пост {i}")
+            for i in range(3)
+        ]
+        shards = -(-posts[-1].pk // 2)
+        response = self.client.get(reverse("posts:sitemap"))
+        self.assertTrue(response.streaming)
+        index = b"".join(response.streaming_content).decode()
+        self.assertEqual(index.count("<sitemap>"), shards)
+        locations = ""
+        for shard in range(1, shards + 1):
+            response = self.client.get(
+                reverse("posts:sitemap_shard", kwargs={"shard": shard})
+            )
+            self.assertEqual(response.status_code, ht.OK)
+            self.assertTrue(response.has_header("ETag"))
+            self.assertIn(f"sitemap-{shard}.xml", index)
+            locations += b"".join(response.streaming_content).decode()
+        for post in posts:
+            self.assertIn(reverse("posts:post_detail",
+                                  kwargs={"post_id": post.pk}) + "<",
+                          locations)
+        response = self.client.get(
+            reverse("posts:sitemap_shard", kwargs={"shard": shards + 1})
+        )
+        self.assertEqual(response.status_code, ht.NOT_FOUND)
@@ -0,0 +1,100 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import graph
+from posts.graph import FollowerGraph
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class FollowerGraphTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = [
+            User.objects.create(username=f"graph_{i}") for i in range(5)
+        ]
+        first, second, third, fourth, fifth = cls.users
+        for user, author in ((first, second), (first, third),
+                             (second, fourth), (third, fourth),
+                             (third, fifth)):
+            Follow.objects.create(user=user, author=author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.users[0])
+
+    def test_structure(self):
+        first, second, third, fourth, fifth = (u.pk for u in self.users)
+        follower_graph = FollowerGraph([(first, third), (first, second)])
+        self.assertEqual(list(follower_graph.authors(first)),
+                         sorted([second, third]))
+        self.assertTrue(follower_graph.follows(first, second))
+        self.assertFalse(follower_graph.follows(second, first))
+        follower_graph.add(second, fourth)
+        follower_graph.add(third, fourth)
+        follower_graph.add(third, fifth)
+        self.assertEqual(follower_graph.suggestions(first, 5, 10),
+                         [fourth, fifth])
+        self.assertEqual(follower_graph.suggestions(first, 1, 10), [fourth])
+        follower_graph.remove(first, second)
+        self.assertFalse(follower_graph.follows(first, second))
+        self.assertEqual(list(follower_graph.authors(first)), [third])
+
+    def test_follows_sees_uncommitted_changes_only(self):
+        graph._graph = FollowerGraph.load()
+        self.addCleanup(graph.reset)
+        first, second = self.users[:2]
+        self.assertTrue(graph.follows(first.pk, second.pk))
+        with transaction.atomic():
+            Follow.objects.filter(user=first, author=second).delete()
+            self.assertFalse(graph.follows(first.pk, second.pk))
+            transaction.set_rollback(True)
+        self.assertTrue(graph.follows(first.pk, second.pk))
+
+    def test_suggestions_in_views(self):
+        expected = [self.users[3], self.users[4]]
+        for url in (
+            reverse("posts:profile", kwargs={"username": self.users[1]}),
+            reverse("posts:follow_index"),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.context["suggestions"], expected)
+        self.client.get(reverse("posts:profile_follow",
+                                kwargs={"username": self.users[3]}))
+        response = self.client.get(reverse("posts:follow_index"))
+        self.assertEqual(response.context["suggestions"], [self.users[4]])
+
+    def test_stale_graph_does_not_drive_writes(self):
+        first, _, _, fourth, _ = self.users
+        graph._graph = FollowerGraph([])
+        try:
+            Follow.objects.bulk_create([Follow(user=first, author=fourth)])
+            self.client.get(reverse("posts:profile_follow",
+                                    kwargs={"username": fourth}))
+            self.assertEqual(
+                Follow.objects.filter(user=first, author=fourth).count(), 1
+            )
+            graph._graph = FollowerGraph([])
+            self.client.get(reverse("posts:profile_unfollow",
+                                    kwargs={"username": fourth}))
+            self.assertFalse(
+                Follow.objects.filter(user=first, author=fourth).exists()
+            )
+        finally:
+            graph.reset()
+
+    def test_stale_graph_does_not_drive_follow_button(self):
+        first, _, _, fourth, _ = self.users
+        graph._graph = FollowerGraph([(first.pk, fourth.pk)])
+        try:
+            response = self.client.get(
+                reverse("posts:profile", kwargs={"username": fourth})
+            )
+            self.assertFalse(response.context["following"])
+        finally:
+            graph.reset()
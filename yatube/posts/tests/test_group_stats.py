@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import group_stats
+from posts.models import Group, GroupAuthorStats, GroupStats, Post
+
+User = get_user_model()
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first = User.objects.create(username="stats_first")
+        cls.second = User.objects.create(username="stats_second")
+        cls.group = Group.objects.create(title="Коты", slug="cats",
+                                         description="Про котов")
+        cls.other = Group.objects.create(title="Собаки", slug="dogs",
+                                         description="Про собак")
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_stats(self, group, posts_count, authors_count, last_post):
+        stats = GroupStats.objects.get(group=group)
+        self.assertEqual(
+            (stats.posts_count, stats.authors_count, stats.last_pub_date),
+            (posts_count, authors_count,
+             last_post.pub_date if last_post else None),
+        )
+        self.assertEqual(
+            GroupAuthorStats.objects.filter(group=group).count(),
+            authors_count,
+        )
+
+    def test_stats_follow_create_move_and_delete(self):
+        old = Post.objects.create(author=self.first, group=self.group,
+                                  text="Первый")
+        new = Post.objects.create(author=self.second, group=self.group,
+                                  text="Второй")
+        self.assert_stats(self.group, 2, 2, new)
+        new.group = self.other
+        new.save()
+        self.assert_stats(self.group, 1, 1, old)
+        self.assert_stats(self.other, 1, 1, new)
+        old.delete()
+        self.assert_stats(self.group, 0, 0, None)
+
+    def test_missing_stats_are_built_and_reconciled(self):
+        post = Post.objects.create(author=self.first, group=self.group,
+                                   text="Пост")
+        GroupStats.objects.all().delete()
+        stats = group_stats.get_stats([self.group])[self.group.pk]
+        self.assertEqual((stats.posts_count, stats.authors_count), (1, 1))
+        GroupStats.objects.filter(group=self.group).update(posts_count=7)
+        self.assertEqual(group_stats.reconcile(), 1)
+        self.assert_stats(self.group, 1, 1, post)
+
+    def test_directory_reads_rollup(self):
+        Post.objects.create(author=self.first, group=self.group, text="Пост")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse("posts:group_index"))
+        self.assertContains(response, self.group.title)
+        self.assertContains(response, "Постов: 1")
+        self.assertEqual(
+            [group for group, _ in response.context["groups"]],
+            [self.group, self.other],
+        )
+        self.assertFalse(any('"posts_post"' in query["sql"]
+                             for query in context.captured_queries))
+
+    def test_deleting_author_updates_stats(self):
+        post = Post.objects.create(author=self.first, group=self.group,
+                                   text="Остаётся")
+        Post.objects.create(author=self.second, group=self.group,
+                            text="Удаляется с автором")
+        User.objects.get(pk=self.second.pk).delete()
+        self.assert_stats(self.group, 1, 1, post)
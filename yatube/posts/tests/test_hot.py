@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import hot
+from posts.models import Comment, Post, PostScore
+
+User = get_user_model()
+
+
+class HotPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="hot_author")
+        cls.old = Post.objects.create(author=cls.author, text="Обсуждали")
+        cls.new = Post.objects.create(author=cls.author, text="Обсуждают")
+        cls.quiet = Post.objects.create(author=cls.author, text="Молчат")
+
+    def setUp(self):
+        cache.clear()
+
+    def comment(self, post, age=timedelta()):
+        comment = Comment.objects.create(post=post, author=self.author,
+                                         text="Комментарий")
+        Comment.objects.filter(pk=comment.pk).update(
+            created=timezone.now() - age
+        )
+
+    def ranking(self):
+        return list(PostScore.objects.order_by("-score")
+                    .values_list("post_id", flat=True))
+
+    def test_recent_comments_outrank_old_ones(self):
+        for _ in range(5):
+            self.comment(self.old, age=timedelta(days=2))
+        self.comment(self.new)
+        self.assertEqual(hot.update(), 6)
+        self.assertEqual(self.ranking(), [self.new.pk, self.old.pk])
+
+    def test_update_is_incremental(self):
+        self.comment(self.old, age=timedelta(hours=3))
+        self.comment(self.new, age=timedelta(hours=1))
+        hot.update(batch_size=1)
+        self.assertEqual(hot.update(), 0)
+        self.comment(self.old)
+        self.comment(self.old)
+        self.assertEqual(hot.update(), 2)
+        scores = dict(PostScore.objects.values_list("post_id", "score"))
+        self.assertEqual(hot.rebuild(), 4)
+        for post_id, score in PostScore.objects.values_list("post_id",
+                                                            "score"):
+            self.assertAlmostEqual(scores[post_id], score)
+
+    def test_popular_page(self):
+        self.comment(self.old)
+        hot.update()
+        url = reverse("posts:popular")
+        self.assertEqual(list(self.client.get(url).context["page_obj"]),
+                         [self.old])
+        self.comment(self.new)
+        self.comment(self.new)
+        hot.update()
+        response = self.client.get(url)
+        self.assertEqual(list(response.context["page_obj"]),
+                         [self.new, self.old])
+        self.assertNotContains(response, self.quiet.text)
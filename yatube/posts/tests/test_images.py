@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from posts import cache_versions as versions
+from posts import images
+from posts.models import Post, StoredImage
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+
+
+def upload(name="small.gif", content=SMALL_GIF):
+    return SimpleUploadedFile(name, content, content_type="image/gif")
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ContentAddressedImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username="hasher")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self, image):
+        return Post.objects.create(author=self.user, text="Картинка",
+                                   image=image)
+
+    def test_same_upload_is_stored_once(self):
+        first = self.create_post(upload("one.GIF"))
+        second = self.create_post(upload("two.gif"))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(images.storage().is_addressed(first.image.name))
+        self.assertRegex(first.image.name,
+                         r"^posts/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.gif$")
+        self.assertTrue(os.path.exists(first.image.path))
+        self.assertEqual(StoredImage.objects.get(name=first.image.name).refs,
+                         2)
+        self.assertEqual(os.listdir(os.path.join(TEMP_MEDIA_ROOT, "tmp")),
+                         [])
+
+    def test_references_are_released(self):
+        first = self.create_post(upload())
+        second = self.create_post(upload())
+        name = first.image.name
+        first.delete()
+        self.assertEqual(StoredImage.objects.get(name=name).refs, 1)
+        second.image = upload(content=SMALL_GIF + b"\x00")
+        second.save()
+        self.assertNotEqual(second.image.name, name)
+        self.assertEqual(StoredImage.objects.get(name=name).refs, 0)
+        self.assertEqual(
+            StoredImage.objects.get(name=second.image.name).refs, 1
+        )
+        images._delete_unused(name)
+        self.assertFalse(StoredImage.objects.filter(name=name).exists())
+        self.assertFalse(images.storage().exists(name))
+
+    def test_reacquired_image_is_not_deleted(self):
+        first = self.create_post(upload())
+        name = first.image.name
+        first.delete()
+        # Та же картинка загружена до срабатывания отложенного удаления.
+        images.acquire(name)
+        images._delete_unused(name)
+        self.assertEqual(StoredImage.objects.get(name=name).refs, 1)
+        self.assertTrue(images.storage().exists(name))
+
+    def test_migrate_images_command(self):
+        legacy = FileSystemStorage().save("posts/legacy.gif",
+                                          ContentFile(SMALL_GIF))
+        post = self.create_post("")
+        Post.objects.filter(pk=post.pk).update(image=legacy)
+        version = versions.get_version(versions.POST, post.pk)
+        call_command("migrate_images", stdout=StringIO())
+        self.assertNotEqual(versions.get_version(versions.POST, post.pk),
+                            version)
+        post.refresh_from_db()
+        self.assertTrue(images.storage().is_addressed(post.image.name))
+        self.assertTrue(os.path.exists(post.image.path))
+        self.assertFalse(FileSystemStorage().exists(legacy))
+        self.assertEqual(StoredImage.objects.get(name=post.image.name).refs,
+                         1)
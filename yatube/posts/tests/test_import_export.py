@@ -0,0 +1,97 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts import cache_versions as versions
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ImportExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="export_author")
+        cls.reader = User.objects.create(username="export_reader")
+        cls.group = Group.objects.create(
+            title="Export group",
+            slug="export_group",
+            description="Export group",
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text="Выгружаемый пост",
+            image="posts/export.jpg",
+        )
+        Post.objects.create(author=cls.reader, text="Пост без группы")
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text="Комментарий"
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def snapshot(self):
+        return {
+            "posts": list(Post.objects.order_by("pub_date").values_list(
+                "text", "pub_date", "author__username", "group__slug",
+                "image", "comment_count",
+            )),
+            "comments": list(Comment.objects.values_list(
+                "post__text", "author__username", "text", "created",
+            )),
+            "follows": list(Follow.objects.values_list(
+                "user__username", "author__username",
+            )),
+        }
+
+    def export(self):
+        handle, path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command("export_posts", output=path, stderr=StringIO())
+        return path
+
+    def round_trip(self, **options):
+        expected = self.snapshot()
+        path = self.export()
+        for model in (Follow, Post, Group, User):
+            model.objects.all().delete()
+        call_command("import_posts", path, stdout=StringIO(), **options)
+        self.assertEqual(self.snapshot(), expected)
+        self.assertEqual(Group.objects.count(), 1)
+        self.assertEqual(User.objects.count(), 2)
+        reader = User.objects.get(username="export_reader")
+        self.assertFalse(reader.has_usable_password())
+        self.assertEqual(reader.counters.following_count, 1)
+        self.assertEqual(reader.timeline.count(), 1)
+
+    def test_round_trip(self):
+        self.round_trip(batch_size=1)
+
+    def test_round_trip_with_workers(self):
+        self.round_trip(workers=1)
+
+    def test_import_is_idempotent_for_users_and_groups(self):
+        path = self.export()
+        call_command("import_posts", path, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(Group.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(Post.objects.count(), 4)
+
+    def test_import_resets_shared_versions(self):
+        path = self.export()
+        keys = (
+            (versions.FEED, None),
+            (versions.GROUP, self.group.pk),
+            (versions.AUTHOR, self.author.pk),
+            (versions.POST, self.post.pk),
+        )
+        before = [versions.get_version(*key) for key in keys]
+        call_command("import_posts", path, stdout=StringIO())
+        for key, version in zip(keys, before):
+            with self.subTest(key=key):
+                self.assertNotEqual(versions.get_version(*key), version)
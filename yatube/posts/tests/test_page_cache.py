@@ -0,0 +1,151 @@
+import gzip
+from http import HTTPStatus as ht
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from posts import cache_versions as versions
+from posts.checks import check_versions_cache
+from posts.middleware import HITS_KEY, MISSES_KEY, hit_ratio
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="page_author")
+        cls.group = Group.objects.create(
+            title="Page group",
+            slug="page_group",
+            description="Page group",
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text="Пост в кеше"
+        )
+        cls.index = reverse("posts:index")
+        cls.detail = reverse("posts:post_detail",
+                             kwargs={"post_id": cls.post.pk})
+        cls.group_url = reverse("posts:group_list",
+                                kwargs={"slug": cls.group.slug})
+
+    def setUp(self):
+        cache.clear()
+        caches[versions.CACHE_ALIAS].delete_many([HITS_KEY, MISSES_KEY])
+        self.guest_client = Client()
+
+    def test_hit_without_queries(self):
+        first = self.guest_client.get(self.index)
+        self.assertEqual(first["X-Page-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            second = self.guest_client.get(self.index)
+        self.assertEqual(second["X-Page-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(hit_ratio(), (1, 1, 0.5))
+
+    def test_stored_compressed(self):
+        first = self.guest_client.get(self.index, {"page": 1})
+        second = self.guest_client.get(
+            self.index, {"page": 1}, HTTP_ACCEPT_ENCODING="gzip, br"
+        )
+        self.assertEqual(second["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(second.content), first.content)
+
+    def test_not_modified_from_cache(self):
+        etag = self.guest_client.get(self.detail)["ETag"]
+        response = self.guest_client.get(self.detail,
+                                         HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, ht.NOT_MODIFIED)
+
+    def test_targeted_purge(self):
+        for url in (self.index, self.detail, self.group_url):
+            self.guest_client.get(url)
+        Comment.objects.create(post=self.post, author=self.author,
+                               text="Комментарий")
+        self.assertEqual(self.guest_client.get(self.detail)["X-Page-Cache"],
+                         "MISS")
+        self.assertEqual(self.guest_client.get(self.index)["X-Page-Cache"],
+                         "HIT")
+        self.group.title = "Новое название"
+        self.group.save()
+        response = self.guest_client.get(self.group_url)
+        self.assertEqual(response["X-Page-Cache"], "MISS")
+        self.assertContains(response, "Новое название")
+
+    def test_purge_from_another_process(self):
+        self.guest_client.get(self.detail)
+        other_process = FileBasedCache(
+            settings.CACHES["versions"]["LOCATION"], {}
+        )
+        other_process.delete(
+            versions.version_key(versions.POST, self.post.pk)
+        )
+        self.assertEqual(self.guest_client.get(self.detail)["X-Page-Cache"],
+                         "MISS")
+
+    def test_stats_from_another_process(self):
+        self.guest_client.get(self.index)
+        self.guest_client.get(self.index)
+        # У новой команды свой пустой локальный кеш.
+        cache.clear()
+        out = StringIO()
+        call_command("page_cache_stats", stdout=out)
+        self.assertIn("Попаданий: 1, промахов: 1", out.getvalue())
+
+    def test_versions_cache_must_be_shared(self):
+        self.assertEqual(check_versions_cache(None), [])
+        local = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        with override_settings(CACHES={"default": local, "versions": local}):
+            errors = check_versions_cache(None)
+        self.assertEqual([error.id for error in errors], ["posts.E001"])
+
+    def test_skipped_requests(self):
+        authorized_client = Client()
+        authorized_client.force_login(self.author)
+        for client, params in ((authorized_client, None),
+                               (self.guest_client, {"cursor": ""})):
+            client.get(self.index, params)
+            response = client.get(self.index, params)
+            self.assertFalse(response.has_header("X-Page-Cache"))
+
+
+class CommitInvalidationTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username="commit_author")
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        self.index = reverse("posts:index")
+
+    def test_page_read_before_commit_is_not_served(self):
+        with transaction.atomic():
+            post = Post.objects.create(author=self.author,
+                                       text="Пост из транзакции")
+            # Параллельный запрос до фиксации: нового поста он не видит,
+            # а версии после сброса пересоздаёт.
+            savepoint = transaction.savepoint()
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM posts_post WHERE id = %s",
+                               [post.pk])
+            for client in (self.guest_client, self.authorized_client):
+                self.assertNotContains(client.get(self.index), post.text)
+            transaction.savepoint_rollback(savepoint)
+        response = self.guest_client.get(self.index)
+        self.assertEqual(response["X-Page-Cache"], "MISS")
+        self.assertContains(response, post.text)
+        response = self.guest_client.get(self.index)
+        self.assertEqual(response["X-Page-Cache"], "HIT")
+        self.assertContains(response, post.text)
+        self.assertContains(self.authorized_client.get(self.index),
+                            post.text)
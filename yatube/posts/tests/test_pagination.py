@@ -0,0 +1,82 @@
+from django.conf import settings as st
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, Follow
+from posts.utils import CursorPage, decode_cursor, encode_cursor
+
+User = get_user_model()
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username="cursor_author")
+        cls.reader = User.objects.create(username="cursor_reader")
+        cls.group = Group.objects.create(
+            title="Cursor group",
+            slug="cursor_group",
+            description="Cursor group",
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f"Пост {i}")
+            for i in range(st.POST_LIMIT + 3)
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        cls.urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": cls.group.slug}),
+            reverse("posts:profile", kwargs={"username": cls.user}),
+            reverse("posts:follow_index"),
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_cursor_round_trip(self):
+        post = Post.objects.first()
+        token = encode_cursor(post.pub_date, post.pk, backwards=True)
+        self.assertEqual(decode_cursor(token),
+                         (post.pub_date, post.pk, True))
+        self.assertIsNone(decode_cursor("не-курсор"))
+
+    def test_cursor_pages_cover_feed(self):
+        expected = list(
+            Post.objects.order_by("-pub_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.client.get(url, {"cursor": ""})
+                page_obj = first.context["page_obj"]
+                self.assertIsInstance(page_obj, CursorPage)
+                self.assertEqual(len(page_obj), st.POST_LIMIT)
+                self.assertFalse(page_obj.has_previous())
+                self.assertIsNone(page_obj.count)
+                second = self.client.get(
+                    url, {"cursor": page_obj.next_cursor}
+                ).context["page_obj"]
+                self.assertEqual(len(second), 3)
+                self.assertFalse(second.has_next())
+                ids = [post.id for post in page_obj] + [
+                    post.id for post in second
+                ]
+                self.assertEqual(ids, expected)
+                back = self.client.get(
+                    url, {"cursor": second.previous_cursor}
+                ).context["page_obj"]
+                self.assertEqual([post.id for post in back],
+                                 expected[:st.POST_LIMIT])
+                self.assertFalse(back.has_previous())
+
+    @override_settings(PAGINATION_MODE="cursor", PAGINATOR_EXACT_COUNT=True)
+    def test_cursor_mode_setting_and_exact_count(self):
+        response = self.client.get(reverse("posts:index"))
+        page_obj = response.context["page_obj"]
+        self.assertIsInstance(page_obj, CursorPage)
+        self.assertEqual(page_obj.count, st.POST_LIMIT + 3)
+        self.assertContains(response, f"?cursor={page_obj.next_cursor}")
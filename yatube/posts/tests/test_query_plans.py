@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import hot
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+WATCHED_TABLES = ("posts_", "auth_user")
+# Граф подписок намеренно загружается целиком.
+FULL_SCANS = (
+    'SELECT "posts_follow"."user_id", "posts_follow"."author_id" '
+    'FROM "posts_follow"',
+    # Таблица рейтингов не шире своего индекса, SQLite считает её целиком.
+    'SELECT COUNT(*) AS "__count" FROM "posts_postscore"',
+)
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="planner")
+        cls.reader = User.objects.create(username="plan_reader")
+        cls.group = Group.objects.create(title="Планы", slug="plans",
+                                         description="-")
+        cls.post = Post.objects.create(author=cls.author, group=cls.group,
+                                       text="Пост для плана")
+        Comment.objects.create(post=cls.post, author=cls.reader,
+                               text="Комментарий")
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assert_indexed(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(url, params)
+        for query in context.captured_queries:
+            sql = query["sql"]
+            if sql in FULL_SCANS or not sql.startswith("SELECT") or not any(
+                table in sql for table in WATCHED_TABLES
+            ):
+                continue
+            for step in self.plan(sql):
+                with self.subTest(url=url, sql=sql, step=step):
+                    self.assertNotIn("TEMP B-TREE", step)
+                    if step.startswith("SCAN"):
+                        self.assertIn("INDEX", step)
+
+    def test_feeds_use_indexes(self):
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:group_index"),
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:profile", kwargs={"username": self.author}),
+            reverse("posts:follow_index"),
+        )
+        for url in urls:
+            self.assert_indexed(url)
+            self.assert_indexed(url, {"cursor": ""})
+        hot.update()
+        self.assert_indexed(reverse("posts:popular"))
+
+    def test_post_detail_uses_indexes(self):
+        self.assert_indexed(
+            reverse("posts:post_detail", kwargs={"post_id": self.post.id})
+        )
+        self.assert_indexed(
+            reverse("posts:post_comments", kwargs={"post_id": self.post.id})
+        )
+
+    def test_write_views_use_indexes(self):
+        self.assert_indexed(
+            reverse("posts:profile_unfollow",
+                    kwargs={"username": self.author})
+        )
+        self.assert_indexed(
+            reverse("posts:profile_follow", kwargs={"username": self.author})
+        )
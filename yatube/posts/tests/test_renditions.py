@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import renditions
+from posts.imaging import make_renditions
+from posts.models import Post, PostRendition
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x02\x00"
+    b"\x01\x00\x80\x00\x00\x00\x00\x00"
+    b"\xFF\xFF\xFF\x21\xF9\x04\x00\x00"
+    b"\x00\x00\x00\x2C\x00\x00\x00\x00"
+    b"\x02\x00\x01\x00\x00\x02\x02\x0C"
+    b"\x0A\x00\x3B"
+)
+OTHER_GIF = SMALL_GIF.replace(b"\xFF\xFF\xFF", b"\x00\x80\xFF", 1)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class RenditionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username="painter")
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text="Пост с картинкой",
+            image=SimpleUploadedFile("small.gif", SMALL_GIF,
+                                     content_type="image/gif"),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_generate_stores_all_sizes_and_formats(self):
+        renditions.generate(self.post)
+        stored = PostRendition.objects.filter(post=self.post)
+        self.assertEqual(
+            stored.count(),
+            len(settings.POST_IMAGE_SIZES) * len(settings.POST_IMAGE_FORMATS),
+        )
+        for rendition in stored:
+            with self.subTest(name=rendition.name):
+                self.assertTrue(os.path.exists(
+                    os.path.join(TEMP_MEDIA_ROOT, rendition.name)
+                ))
+
+    def test_templates_use_stored_renditions(self):
+        renditions.generate(self.post)
+        client = Client()
+        for url in (
+            reverse("posts:index"),
+            reverse("posts:profile", kwargs={"username": self.user}),
+            reverse("posts:post_detail", kwargs={"post_id": self.post.id}),
+        ):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertContains(response, 'type="image/webp"')
+                self.assertContains(response, "_960x339.jpg 960w")
+
+    @override_settings(THUMBNAIL_WORKERS=1)
+    def test_process_pool_renders_outside_request(self):
+        future = renditions.get_executor().submit(
+            make_renditions, self.post.image.path, TEMP_MEDIA_ROOT,
+            "renditions/pool", ((48, 17),), ("webp",),
+        )
+        self.assertEqual(future.result(timeout=60),
+                         [("renditions/pool_48x17.webp", 48, 17, "webp")])
+
+    def test_replaced_image_deletes_superseded_files(self):
+        post = Post.objects.get(pk=self.post.pk)
+        renditions.generate(post)
+        old = list(PostRendition.objects.filter(post=post)
+                   .values_list("name", flat=True))
+        post.image = SimpleUploadedFile("other.gif", OTHER_GIF,
+                                        content_type="image/gif")
+        post.save()
+        with mock.patch("django.db.transaction.on_commit",
+                        side_effect=lambda func: func()):
+            renditions.generate(post)
+        for name in old:
+            with self.subTest(name=name):
+                self.assertFalse(os.path.exists(
+                    os.path.join(TEMP_MEDIA_ROOT, name)
+                ))
+        for rendition in PostRendition.objects.filter(post=post):
+            with self.subTest(name=rendition.name):
+                self.assertTrue(os.path.exists(
+                    os.path.join(TEMP_MEDIA_ROOT, rendition.name)
+                ))
+
+    def test_superseded_files_survive_rollback(self):
+        post = Post.objects.get(pk=self.post.pk)
+        renditions.generate(post)
+        old = list(PostRendition.objects.filter(post=post)
+                   .values_list("name", flat=True))
+        post.image = None
+        renditions.generate(post)
+        for name in old:
+            with self.subTest(name=name):
+                self.assertTrue(os.path.exists(
+                    os.path.join(TEMP_MEDIA_ROOT, name)
+                ))
@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts import cache_versions as versions
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(REPLICA_DATABASES=["replica"])
+class ReplicaRouterTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username="replica_author")
+        self.post = Post.objects.create(author=self.author,
+                                        text="Пост на реплике")
+        handle, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        connection.ensure_connection()
+        with sqlite3.connect(self.path) as replica:
+            connection.connection.backup(replica)
+        connections.databases["replica"] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": self.path,
+        }
+        connections.ensure_defaults("replica")
+        connections.prepare_test_settings("replica")
+        self.fresh = Post.objects.create(author=self.author,
+                                         text="Только в основной базе")
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def tearDown(self):
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.databases["replica"]
+        os.remove(self.path)
+
+    def sync_replica(self, without=None):
+        """Догоняет реплику; without - пост, которого на ней не будет."""
+        connections["replica"].close()
+        with sqlite3.connect(self.path) as replica:
+            connection.connection.backup(replica)
+            if without is not None:
+                replica.execute("DELETE FROM posts_post WHERE id = ?",
+                                [without.pk])
+
+    def test_current_replica_serves_reads(self):
+        self.sync_replica(without=self.fresh)
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, self.post.text)
+        self.assertNotContains(response, self.fresh.text)
+        response = self.client.get(
+            reverse("posts:post_detail", kwargs={"post_id": self.fresh.pk})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_lagging_replica_is_not_cached(self):
+        # Реплика снята до записи свежего поста и сброса версий.
+        response = Client().get(reverse("posts:index"))
+        self.assertContains(response, self.fresh.text)
+        self.sync_replica(without=self.fresh)
+        Post.objects.create(author=self.author, text="Ещё один пост")
+        response = Client().get(reverse("posts:index"))
+        self.assertContains(response, self.fresh.text)
+        self.assertContains(response, "Ещё один пост")
+
+    def test_write_during_request_falls_back_to_primary(self):
+        self.sync_replica(without=self.fresh)
+        client = Client()
+        with mock.patch("posts.views.versions.get_version",
+                        side_effect=self.write_then_get_version):
+            response = client.get(reverse("posts:index"))
+        self.assertContains(response, self.fresh.text)
+        self.assertNotEqual(response["X-Page-Cache"], "HIT")
+        response = client.get(reverse("posts:index"))
+        self.assertEqual(response["X-Page-Cache"], "MISS")
+
+    def write_then_get_version(self, scope, pk=None):
+        Post.objects.filter(pk=self.post.pk).update(text="Правка")
+        versions.bump(versions.version_key(scope, pk))
+        return versions.get_versions(versions.version_key(scope, pk))
+
+    def test_session_is_pinned_after_write(self):
+        self.client.post(
+            reverse("posts:add_comment", kwargs={"post_id": self.post.pk}),
+            {"text": "Комментарий"},
+        )
+        self.sync_replica(without=self.fresh)
+        response = self.client.get(reverse("posts:index"))
+        self.assertContains(response, self.fresh.text)
+        cache.clear()
+        response = Client().get(reverse("posts:index"))
+        self.assertContains(response, self.post.text)
+        self.assertNotContains(response, self.fresh.text)
@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import search
+from posts.models import Group, Post
+from posts.stemmer import stem
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="lev", first_name="Лев",
+                                         last_name="Толстой")
+        cls.group = Group.objects.create(title="Кошачьи истории",
+                                         slug="cats", description="-")
+        cls.cats = Post.objects.create(
+            author=cls.author, text="Кошки гуляли по крыше", group=cls.group
+        )
+        cls.dogs = Post.objects.create(author=cls.author,
+                                       text="Собака лаяла на луну")
+
+    def setUp(self):
+        self.client = Client()
+
+    def found(self, query):
+        return list(search.search(query)[0:10])
+
+    def test_russian_stemming(self):
+        self.assertEqual(stem("кошками"), stem("кошка"))
+        self.assertEqual(stem("гуляли"), stem("гулять"))
+        self.assertEqual(self.found("кошкой"), [self.cats])
+        self.assertEqual(self.found("гулять крыша"), [self.cats])
+
+    def test_author_and_group_are_indexed(self):
+        self.assertEqual(self.found("истории"), [self.cats])
+        self.assertEqual(len(self.found("Толстого")), 2)
+
+    def test_index_follows_signals(self):
+        dogs = Post.objects.get(pk=self.dogs.pk)
+        dogs.text = "Собака гуляла с кошкой"
+        dogs.save()
+        self.assertEqual(set(self.found("кошки")), {self.cats, self.dogs})
+        Post.objects.get(pk=self.cats.pk).delete()
+        self.assertEqual(self.found("кошки"), [self.dogs])
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = "Новости"
+        group.save()
+        self.assertEqual(self.found("истории"), [])
+        author = User.objects.get(pk=self.author.pk)
+        author.last_name = "Чехов"
+        author.save()
+        self.assertEqual(self.found("Чехов"), [self.dogs])
+
+    def test_search_page(self):
+        response = self.client.get(reverse("posts:search"), {"q": "луна"})
+        self.assertEqual(list(response.context["page_obj"]), [self.dogs])
+        self.assertContains(response, "Собака лаяла на луну")
+
+    def test_admin_search_uses_index(self):
+        admin = User.objects.create_superuser("admin", "a@a.ru", "pass")
+        self.client.force_login(admin)
+        response = self.client.get(reverse("admin:posts_post_changelist"),
+                                   {"q": "собаки"})
+        self.assertEqual(list(response.context["cl"].result_list),
+                         [self.dogs])
+        response = self.client.get(reverse("admin:posts_post_changelist"),
+                                   {"q": "!!!"})
+        self.assertEqual(list(response.context["cl"].result_list), [])
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.TABLE}")
+        self.assertEqual(self.found("кошки"), [])
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self.found("кошки"), [self.cats])
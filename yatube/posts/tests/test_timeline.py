@@ -0,0 +1,82 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import timeline
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username="timeline_author")
+        cls.reader = User.objects.create(username="timeline_reader")
+        cls.old_post = Post.objects.create(author=cls.author, text="Старый")
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def timeline_ids(self):
+        return list(
+            TimelineEntry.objects.filter(user=self.reader)
+            .order_by("-pub_date", "-id")
+            .values_list("post_id", flat=True)
+        )
+
+    def test_follow_backfills_and_unfollow_clears(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.timeline_ids(), [self.old_post.id])
+        self.client.get(reverse("posts:profile_unfollow",
+                                kwargs={"username": self.author}))
+        self.assertEqual(self.timeline_ids(), [])
+
+    def test_post_create_and_delete_fan_out(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        new_post = Post.objects.create(author=self.author, text="Новый")
+        self.assertEqual(self.timeline_ids(),
+                         [new_post.id, self.old_post.id])
+        new_post.delete()
+        self.assertEqual(self.timeline_ids(), [self.old_post.id])
+
+    @override_settings(TIMELINE_LIMIT=2)
+    def test_timeline_is_capped(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [
+            Post.objects.create(author=self.author, text=f"Пост {i}")
+            for i in range(3)
+        ]
+        self.assertEqual(self.timeline_ids(), [posts[2].id, posts[1].id])
+
+    @override_settings(TIMELINE_LIMIT=1)
+    def test_fan_out_queries_do_not_grow_with_followers(self):
+        readers = [self.reader] + [
+            User.objects.create(username=f"timeline_{i}") for i in range(5)
+        ]
+        for reader in readers:
+            Follow.objects.create(user=reader, author=self.author)
+        post = Post.objects.create(author=self.author, text="Свежий")
+        self.assertEqual(
+            set(TimelineEntry.objects.values_list("user_id", "post_id")),
+            {(reader.pk, post.pk) for reader in readers},
+        )
+        with self.assertNumQueries(3):
+            timeline.fan_out(post)
+
+    def test_follow_index_reads_timeline(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse("posts:follow_index"))
+        self.assertEqual(list(response.context["page_obj"]), [self.old_post])
+
+    def test_rebuild_timeline_command(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        TimelineEntry.objects.all().delete()
+        call_command("rebuild_timeline", stdout=StringIO())
+        self.assertEqual(self.timeline_ids(), [self.old_post.id])
@@ -269,13 +269,65 @@ class TestCache(TestCase):
             author=self.user,
             group=self.group
         )
-        post_count = Post.objects.count()
         response = self.authorized_client.get(reverse('posts:index'))
         cached_response_content = response.content
-        new_post.delete()
+        Post.objects.filter(pk=new_post.pk).update(text='changed')
         response = self.authorized_client.get(reverse('posts:index'))
-        self.assertEqual(Post.objects.count(), post_count - 1)
         self.assertEqual(cached_response_content, response.content)
         cache.clear()
-        response_two = self.authorized_client.get('posts:index')
+        response_two = self.authorized_client.get(reverse('posts:index'))
         self.assertNotEqual(cached_response_content, response_two.content)
+
+    def test_signals_invalidate_cached_pages(self):
+        cache.clear()
+        post = Post.objects.create(
+            text='Пост до изменения',
+            author=self.user,
+            group=self.group
+        )
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for url in urls:
+            self.authorized_client.get(url)
+        post.text = 'Пост после изменения'
+        post.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertContains(response, 'Пост после изменения')
+        post.delete()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertNotContains(response, 'Пост после изменения')
+
+    def test_moved_post_leaves_old_group_page(self):
+        cache.clear()
+        other_group = Group.objects.create(title="Other", slug="other")
+        post = Post.objects.create(
+            text='Переезжающий пост',
+            author=self.user,
+            group=self.group
+        )
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        self.assertContains(self.authorized_client.get(url),
+                            'Переезжающий пост')
+        post.group = other_group
+        post.save()
+        self.assertNotContains(self.authorized_client.get(url),
+                               'Переезжающий пост')
+
+    def test_new_comment_visible_on_cached_post_detail(self):
+        cache.clear()
+        post = Post.objects.create(text='Пост', author=self.user)
+        url = reverse('posts:post_detail', kwargs={'post_id': post.id})
+        self.authorized_client.get(url)
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.id}),
+            data={'text': 'Свежий комментарий'},
+        )
+        self.assertContains(self.authorized_client.get(url),
+                            'Свежий комментарий')
@@ -0,0 +1,87 @@
+from django.conf import settings as st
+from django.db import connection
+from django.db.models import QuerySet
+
+from .models import Follow, Post, TimelineEntry
+
+
+def _entries(user_id, posts):
+    return [
+        TimelineEntry(user_id=user_id, post_id=post_id,
+                      author_id=author_id, pub_date=pub_date)
+        for post_id, author_id, pub_date in posts
+    ]
+
+
+def trim(user_ids):
+    """Обрезает ленты до TIMELINE_LIMIT записей одним запросом.
+
+    user_ids - выборка id пользователей (подставляется подзапросом)
+    или небольшой список.
+    """
+    if isinstance(user_ids, QuerySet):
+        users_sql, params = user_ids.query.sql_with_params()
+    else:
+        users_sql = ", ".join(["%s"] * len(user_ids))
+        params = list(user_ids)
+    if not users_sql:
+        return
+    table = TimelineEntry._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE id IN ("
+            "SELECT id FROM ("
+            "SELECT id, ROW_NUMBER() OVER ("
+            "PARTITION BY user_id ORDER BY pub_date DESC, id DESC"
+            f") AS position FROM {table} WHERE user_id IN ({users_sql})"
+            ") AS ranked WHERE position > %s)",
+            [*params, st.TIMELINE_LIMIT],
+        )
+
+
+def fan_out(post):
+    followers = list(
+        Follow.objects.filter(author_id=post.author_id).values_list(
+            "user_id", flat=True
+        )
+    )
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post=post,
+                          author_id=post.author_id, pub_date=post.pub_date)
+            for user_id in followers
+        ),
+        ignore_conflicts=True,
+    )
+    trim(
+        Follow.objects.filter(author_id=post.author_id)
+        .values("user_id").order_by()
+    )
+
+
+def add_author(user_id, author_id):
+    posts = (
+        Post.objects.filter(author_id=author_id)
+        .order_by("-pub_date")
+        .values_list("id", "author_id", "pub_date")[:st.TIMELINE_LIMIT]
+    )
+    TimelineEntry.objects.bulk_create(
+        _entries(user_id, posts), ignore_conflicts=True
+    )
+    trim([user_id])
+
+
+def remove_author(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild(user_id):
+    TimelineEntry.objects.filter(user_id=user_id).delete()
+    posts = (
+        Post.objects.filter(author__following__user_id=user_id)
+        .order_by("-pub_date")
+        .values_list("id", "author_id", "pub_date")[:st.TIMELINE_LIMIT]
+    )
+    TimelineEntry.objects.bulk_create(
+        _entries(user_id, posts), batch_size=st.TIMELINE_BATCH_SIZE
+    )
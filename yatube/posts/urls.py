@@ -2,16 +2,35 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
-from . import views
+from . import feeds, sitemaps, views
 
 app_name = "posts"
 urlpatterns = [
     path("", views.index, name="index"),
+    path("popular/", views.popular, name="popular"),
+    path("rss/", feeds.index_rss, name="index_rss"),
+    path("atom/", feeds.index_atom, name="index_atom"),
+    path("sitemap.xml", sitemaps.sitemap_index, name="sitemap"),
+    path("sitemap-<int:shard>.xml", sitemaps.sitemap_shard,
+         name="sitemap_shard"),
+    path("group/", views.group_index, name="group_index"),
     path("group/<slug:slug>/", views.group_posts, name="group_list"),
+    path("group/<slug:slug>/rss/", feeds.group_rss, name="group_rss"),
+    path("group/<slug:slug>/atom/", feeds.group_atom, name="group_atom"),
     path("profile/<str:username>/", views.profile, name="profile"),
+    path("profile/<str:username>/rss/", feeds.profile_rss,
+         name="profile_rss"),
+    path("profile/<str:username>/atom/", feeds.profile_atom,
+         name="profile_atom"),
+    path("search/", views.post_search, name="search"),
     path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
     path("create/", views.post_create, name="post_create"),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
+    path(
+        "posts/<int:post_id>/comments/",
+        views.post_comments,
+        name="post_comments"
+    ),
     path(
         "posts/<int:post_id>/comment/",
         views.add_comment,
@@ -1,9 +1,147 @@
+import base64
+import json
+from collections.abc import Mapping, Sequence
+from contextlib import contextmanager
+
 from django.conf import settings as st
 from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+CURSOR_PARAM = "cursor"
+
+
+def encode_cursor(value, pk, backwards=False):
+    payload = json.dumps([value.isoformat(), pk, int(backwards)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        value, pk, backwards = json.loads(base64.urlsafe_b64decode(padded))
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    if value is None:
+        return None
+    return value, pk, bool(backwards)
+
+
+class CursorPage(Sequence):
+    is_cursor = True
+
+    def __init__(self, object_list, token, next_cursor, previous_cursor,
+                 count=None):
+        self.object_list = object_list
+        self.token = token
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def number(self):
+        return self.token
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    def __init__(self, object_list, per_page, field="pub_date",
+                 descending=True, exact_count=False):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.field = field
+        self.descending = descending
+        self.exact_count = exact_count
+
+    def _ordered(self, backwards):
+        forward = self.descending != backwards
+        prefix = "-" if forward else ""
+        return self.object_list.order_by(
+            f"{prefix}{self.field}", f"{prefix}id"
+        )
+
+    def _after(self, queryset, value, pk, backwards):
+        lookup = "lt" if self.descending != backwards else "gt"
+        return queryset.filter(
+            Q(**{f"{self.field}__{lookup}": value})
+            | Q(**{self.field: value, f"id__{lookup}": pk})
+        )
+
+    def _cursor(self, row, backwards=False):
+        if isinstance(row, Mapping):
+            return encode_cursor(row[self.field], row["id"], backwards)
+        return encode_cursor(getattr(row, self.field), row.pk, backwards)
+
+    def get_page(self, token):
+        cursor = decode_cursor(token) if token else None
+        backwards = bool(cursor and cursor[2])
+        queryset = self._ordered(backwards)
+        if cursor is not None:
+            queryset = self._after(queryset, cursor[0], cursor[1], backwards)
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        has_next = has_more if not backwards else True
+        has_previous = cursor is not None if not backwards else has_more
+        if cursor is None:
+            token = ""
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self._cursor(rows[-1])
+        if rows and has_previous:
+            previous_cursor = self._cursor(rows[0], backwards=True)
+        count = self.object_list.count() if self.exact_count else None
+        return CursorPage(rows, token, next_cursor, previous_cursor, count)
+
+
+def cursor_return_page(object_list, request, field="pub_date",
+                       descending=True, per_page=None):
+    paginator = CursorPaginator(
+        object_list,
+        per_page or st.POST_LIMIT,
+        field=field,
+        descending=descending,
+        exact_count=st.PAGINATOR_EXACT_COUNT,
+    )
+    return paginator.get_page(request.GET.get(CURSOR_PARAM))
 
 
 def paginator_return_page(post_list, request):
+    if st.PAGINATION_MODE == "cursor" or CURSOR_PARAM in request.GET:
+        return cursor_return_page(post_list, request)
     paginator = Paginator(post_list, st.POST_LIMIT)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+@contextmanager
+def keep_dates(*models):
+    # bulk_create проставляет auto_now_add сам, а нужны исходные даты.
+    fields = [field for model in models for field in model._meta.fields
+              if getattr(field, "auto_now_add", False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
@@ -1,65 +1,185 @@
+from django.conf import settings as st
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.routers import pin_primary, read_from_replica
+
+from . import cache_versions as versions
+from . import (comment_queue, concurrent, graph, group_stats, hot,
+               renditions, search)
+from .counters import get_counters
+from .freshness import conditional, group_state, post_state, profile_state
 from .forms import PostForm, CommentForm
-from .models import Group, Post, User, Follow
-from .utils import paginator_return_page
+from .models import Group, Post, User, Follow, TimelineEntry
+from .utils import cursor_return_page, paginator_return_page
 
 
+@read_from_replica
 def index(request):
     template = "posts/index.html"
-    posts = Post.objects.all().select_related("author", "group")
+    posts = Post.objects.select_related(
+        "author", "group"
+    ).prefetch_related("renditions")
     context = {
         "page_obj": paginator_return_page(posts, request),
+        "cache_version": versions.get_version(versions.FEED),
+    }
+    return render(request, template, context)
+
+
+@read_from_replica
+def popular(request):
+    template = "posts/popular.html"
+    context = {
+        "page_obj": hot.popular_page(request),
+        "cache_version": versions.get_versions(
+            versions.version_key(versions.FEED),
+            versions.version_key(versions.HOT),
+        ),
+    }
+    return render(request, template, context)
+
+
+@read_from_replica
+def group_index(request):
+    template = "posts/group_index.html"
+    page_obj = Paginator(
+        Group.objects.order_by("title", "pk"), st.POST_LIMIT
+    ).get_page(request.GET.get("page"))
+    stats = group_stats.get_stats(page_obj)
+    context = {
+        "page_obj": page_obj,
+        "groups": [(group, stats[group.pk]) for group in page_obj],
+        "cache_version": versions.get_version(versions.FEED),
     }
     return render(request, template, context)
 
 
+@read_from_replica
+@conditional(group_state)
 def group_posts(request, slug):
     template = "posts/group_list.html"
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    posts = group.posts.select_related("author").prefetch_related(
+        "renditions"
+    )
     context = {
         "group": group,
         "page_obj": paginator_return_page(posts, request),
+        "cache_version": versions.get_version(versions.GROUP, group.pk),
     }
     return render(request, template, context)
 
 
+@read_from_replica
+@conditional(profile_state)
 def profile(request, username):
     template = "posts/profile.html"
     user = User.objects.get(username=username)
-    posts = user.posts.select_related("group")
-    post_count = posts.count()
-    if request.user.is_authenticated:
-        following = request.user.follower.filter(author=user).exists()
-    else:
-        following = False
+    posts = user.posts.select_related("group").prefetch_related(
+        "renditions"
+    )
+    viewer = request.user if request.user.is_authenticated else None
+
+    def is_following():
+        # Кнопка подписки показывает состояние из базы: граф подписок
+        # в процессе может отставать от подписки на другом воркере.
+        if viewer is None:
+            return False
+        return Follow.objects.filter(user=viewer, author=user).exists()
+
+    page_obj, counters, following, cache_version = concurrent.gather(
+        lambda: paginator_return_page(posts, request),
+        lambda: get_counters(user),
+        is_following,
+        lambda: versions.get_version(versions.AUTHOR, user.pk),
+    )
     context = {
-        "post_count": post_count,
+        "post_count": counters.posts_count,
+        "counters": counters,
         "author": user,
-        "page_obj": paginator_return_page(posts, request),
+        "page_obj": page_obj,
         "following": following,
+        "is_author": request.user == user,
+        "cache_version": cache_version,
+        "suggestions": suggested_authors(request.user),
+    }
+    return render(request, template, context)
+
+
+def suggested_authors(user):
+    if not user.is_authenticated:
+        return []
+    author_ids = graph.suggestions(user.pk)
+    authors = User.objects.in_bulk(author_ids)
+    return [authors[pk] for pk in author_ids if pk in authors]
+
+
+def post_search(request):
+    template = "posts/search.html"
+    query = request.GET.get("q", "").strip()
+    results = search.search(query) if query else Post.objects.none()
+    context = {
+        "q": query,
+        "page_obj": Paginator(results, st.POST_LIMIT).get_page(
+            request.GET.get("page")
+        ),
     }
     return render(request, template, context)
 
 
+@read_from_replica
+@conditional(post_state)
 def post_detail(request, post_id):
     template = "posts/post_detail.html"
-    post = get_object_or_404(Post, id=post_id)
-    post_count = post.author.posts.count()
+    post = get_object_or_404(
+        Post.objects.select_related("author", "group").prefetch_related(
+            "renditions"
+        ),
+        id=post_id,
+    )
+    post_count, comments, cache_version = concurrent.gather(
+        lambda: get_counters(post.author).posts_count,
+        lambda: comments_page(post, request),
+        lambda: versions.get_version(versions.POST, post.pk),
+    )
     context = {
         "post": post,
         "post_count": post_count,
         "post_id": post_id,
         "form": CommentForm(),
-        "comments": post.comment.all(),
+        "comments": comments,
+        "pending_comments": (
+            comment_queue.pending_for(request, post)
+            if request.user.is_authenticated else []
+        ),
+        "cache_version": cache_version,
+    }
+    return render(request, template, context)
+
 
+def comments_page(post, request):
+    comments = post.comment.select_related("author")
+    return cursor_return_page(comments, request, field="created",
+                              descending=False, per_page=st.COMMENT_LIMIT)
+
+
+@read_from_replica
+def post_comments(request, post_id):
+    template = "includes/comments_page.html"
+    post = get_object_or_404(Post.objects.only("id"), id=post_id)
+    context = {
+        "post": post,
+        "comments": comments_page(post, request),
+        "cache_version": versions.get_version(versions.POST, post.pk),
     }
     return render(request, template, context)
 
 
 @login_required
+@transaction.atomic
 def post_create(request):
     template = "posts/create_post.html"
     form = PostForm(request.POST or None,
@@ -69,6 +189,8 @@ def post_create(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        renditions.schedule(post)
+        pin_primary(request)
         return redirect("posts:profile", username=post.author)
     context = {"form": form, "is_edit": False}
     return render(request, template, context)
@@ -85,50 +207,81 @@ def post_edit(request, post_id):
         return redirect("posts:post_detail", post_id=post_id)
     if form.is_valid():
         post.save()
+        if "image" in form.changed_data:
+            renditions.schedule(post)
+        pin_primary(request)
         return redirect("posts:post_detail", post_id=post_id)
     context = {"form": form, "is_edit": True}
     return render(request, template, context)
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
     form = CommentForm(request.POST or None)
+    if st.COMMENT_WRITE_BEHIND:
+        if form.is_valid():
+            comment_queue.enqueue(request, post_id, form.cleaned_data["text"])
+        return redirect("posts:post_detail", post_id=post_id)
+    post = get_object_or_404(Post, id=post_id)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
         comment.save()
+        pin_primary(request)
     return redirect("posts:post_detail", post_id=post_id)
 
 
 @login_required
+@read_from_replica
 def follow_index(request):
     template = "posts/follow.html"
-    posts = Post.objects.filter(author__following__user=request.user)
+    entries = TimelineEntry.objects.filter(
+        user=request.user
+    ).select_related("post__author", "post__group").prefetch_related(
+        "post__renditions"
+    ).order_by(
+        "-pub_date", "-id"
+    )
+    page_obj = paginator_return_page(entries, request)
+    page_obj.object_list = [entry.post for entry in page_obj.object_list]
     context = {
-        "page_obj": paginator_return_page(posts, request),
+        "page_obj": page_obj,
+        "cache_version": versions.get_version(
+            versions.FOLLOW, request.user.pk
+        ),
+        "suggestions": suggested_authors(request.user),
     }
     return render(request, template, context)
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     follow_author = get_object_or_404(User, username=username)
-    if follow_author != request.user and (
-            not request.user.follower.filter(author=follow_author).exists()
-    ):
-        Follow.objects.create(
+    if follow_author != request.user:
+        # Решение о записи принимает база: граф подписок - лишь кеш
+        # процесса для рекомендаций и может отставать.
+        follow, created = Follow.objects.get_or_create(
             user=request.user,
             author=follow_author
         )
+        if created:
+            pin_primary(request)
+        else:
+            graph.record(follow, added=True)
     return redirect('posts:profile', username)
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     follow_author = get_object_or_404(User, username=username)
-    data_follow = request.user.follower.filter(author=follow_author)
-    if data_follow.exists():
-        data_follow.delete()
+    deleted, _ = request.user.follower.filter(author=follow_author).delete()
+    if deleted:
+        pin_primary(request)
+    else:
+        graph.record(Follow(user=request.user, author=follow_author),
+                     added=False)
     return redirect("posts:profile", username)
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from django.conf import settings as st
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("pk", "name", "status", "priority", "attempts",
+                    "run_after")
+    list_filter = ("status", "name")
+    # Аргументы могут содержать личные данные, персоналу они не нужны.
+    exclude = ("arguments",)
+    empty_value_display = st.EMPTY_VALUE_DISPLAY
+
+
+admin.site.register(Task, TaskAdmin)
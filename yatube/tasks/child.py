@@ -0,0 +1,27 @@
+import traceback
+
+# Модуль загружается в процессах пула до настройки Django, поэтому
+# модели импортируются внутри функций.
+
+
+def setup():
+    import django
+
+    django.setup()
+
+
+def execute(task_id):
+    """Выполняет задачу; возвращает текст ошибки или None."""
+    from django.db import close_old_connections
+
+    from .models import Task
+    from .registry import registry
+
+    try:
+        task = Task.objects.get(pk=task_id)
+        registry[task.name](*task.args, **task.kwargs)
+    except Exception:
+        return traceback.format_exc()
+    finally:
+        close_old_connections()
+    return None
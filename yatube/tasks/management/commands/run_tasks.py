@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.worker import get_pool, run_batch
+
+
+class Command(BaseCommand):
+    help = "Выполняет фоновые задачи из очереди в пуле процессов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int,
+                            default=settings.TASK_WORKERS,
+                            help="Процессов (0 - в текущем процессе)")
+        parser.add_argument("--once", action="store_true",
+                            help="Выполнить готовые задачи и выйти")
+        parser.add_argument("--sleep", type=float, default=1.0,
+                            help="Пауза при пустой очереди, секунд")
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        pool = get_pool(workers) if workers else None
+        limit = max(workers, 1) * 2
+        done = 0
+        try:
+            while True:
+                processed = run_batch(pool, limit,
+                                      settings.TASK_VISIBILITY_TIMEOUT)
+                done += processed
+                if not processed:
+                    if options["once"]:
+                        break
+                    time.sleep(options["sleep"])
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.stdout.write(f"Выполнено задач: {done}")
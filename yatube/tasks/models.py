@@ -0,0 +1,47 @@
+import json
+
+from django.db import models
+
+
+class Task(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUSES = (
+        (QUEUED, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (FAILED, "Ошибка"),
+    )
+
+    name = models.CharField("Задача", max_length=200)
+    arguments = models.TextField("Аргументы", default="[[], {}]")
+    priority = models.SmallIntegerField("Приоритет", default=0)
+    status = models.CharField("Статус", max_length=10, choices=STATUSES,
+                              default=QUEUED)
+    attempts = models.PositiveSmallIntegerField("Попыток", default=0)
+    max_attempts = models.PositiveSmallIntegerField("Максимум попыток",
+                                                    default=3)
+    run_after = models.DateTimeField("Не раньше")
+    locked_until = models.DateTimeField("Занята до", null=True, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created = models.DateTimeField("Создана", auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "priority", "run_after"],
+                         name="task_status_priority"
+                         ),
+        ]
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+    @property
+    def args(self):
+        return json.loads(self.arguments)[0]
+
+    @property
+    def kwargs(self):
+        return json.loads(self.arguments)[1]
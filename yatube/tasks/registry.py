@@ -0,0 +1,43 @@
+import json
+from datetime import timedelta
+
+from django.utils import timezone
+
+registry = {}
+
+
+class BackgroundTask:
+    def __init__(self, func, name, priority, max_attempts):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, priority=None, countdown=0, **kwargs):
+        """Ставит задачу в очередь в текущей транзакции.
+
+        Аргументы должны сериализоваться в JSON.
+        """
+        from .models import Task
+
+        return Task.objects.create(
+            name=self.name,
+            arguments=json.dumps([args, kwargs]),
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            run_after=timezone.now() + timedelta(seconds=countdown),
+        )
+
+
+def task(name=None, priority=0, max_attempts=3):
+    def decorator(func):
+        background = BackgroundTask(
+            func, name or f"{func.__module__}.{func.__name__}",
+            priority, max_attempts,
+        )
+        registry[background.name] = background
+        return background
+    return decorator
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Task
+from .registry import task
+from .worker import claim, finish, run_batch
+
+User = get_user_model()
+
+calls = []
+
+
+@task(name="tests.record")
+def record(value):
+    calls.append(value)
+
+
+@task(name="tests.explode", max_attempts=2)
+def explode():
+    raise ValueError("boom")
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_runs_by_priority(self):
+        record.delay("low", priority=-1)
+        record.delay("high", priority=5)
+        record.delay("normal")
+        self.assertEqual(run_batch(None, 10, 60), 3)
+        self.assertEqual(calls, ["high", "normal", "low"])
+        self.assertFalse(Task.objects.exists())
+
+    def test_countdown_delays_task(self):
+        record.delay("later", countdown=60)
+        self.assertEqual(run_batch(None, 10, 60), 0)
+        self.assertEqual(calls, [])
+
+    def test_failed_task_is_retried_then_failed(self):
+        job = explode.delay()
+        run_batch(None, 10, 60)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("boom", job.last_error)
+        self.assertGreater(job.run_after, timezone.now())
+        Task.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        run_batch(None, 10, 60)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_claimed_task_is_invisible_until_timeout(self):
+        job = record.delay("once")
+        self.assertEqual([t.pk for t in claim(10, 60)], [job.pk])
+        self.assertEqual(claim(10, 60), [])
+        Task.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual([t.pk for t in claim(10, 60)], [job.pk])
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+
+    def test_expired_worker_cannot_finish_reclaimed_task(self):
+        job = record.delay("twice")
+        first = claim(10, 60)[0]
+        Task.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        second = claim(10, 60)[0]
+        finish(first, "Ошибка")
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.RUNNING)
+        finish(second, None)
+        self.assertFalse(Task.objects.filter(pk=job.pk).exists())
+
+    def test_expired_task_without_attempts_fails(self):
+        job = record.delay("stuck")
+        Task.objects.filter(pk=job.pk).update(
+            status=Task.RUNNING, attempts=job.max_attempts,
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(claim(10, 60), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Task.FAILED)
+
+    @override_settings(BACKGROUND_TASKS=True)
+    def test_password_reset_email_is_queued(self):
+        User.objects.create_user(username="reset", email="reset@ya.ru",
+                                 password="pass")
+        self.client.post(reverse("users:password_reset_form"),
+                         {"email": "reset@ya.ru"})
+        self.assertEqual(len(mail.outbox), 0)
+        job = Task.objects.get(name="users.tasks.send_password_reset")
+        self.assertEqual(job.args, ["reset@ya.ru", "testserver", False])
+        run_batch(None, 10, 60)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["reset@ya.ru"])
+        self.assertIn("http://testserver/auth/reset/", mail.outbox[0].body)
+        self.assertFalse(Task.objects.exists())
+
+    def test_admin_hides_arguments(self):
+        admin = User.objects.create_superuser("admin", "admin@ya.ru", "pass")
+        self.client.force_login(admin)
+        job = record.delay("secret-token")
+        response = self.client.get(
+            reverse("admin:tasks_task_change", args=[job.pk])
+        )
+        self.assertNotContains(response, "secret-token")
@@ -0,0 +1,83 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import child
+from .models import Task
+
+
+def _claimable(now):
+    return Task.objects.filter(
+        Q(status=Task.QUEUED, run_after__lte=now)
+        | Q(status=Task.RUNNING, locked_until__lt=now,
+            attempts__lt=F("max_attempts"))
+    )
+
+
+def claim(limit, visibility_timeout):
+    """Забирает до limit задач; чужие задачи с истёкшим таймаутом тоже.
+
+    Каждая задача занимается отдельным условным UPDATE, поэтому два
+    воркера не получат одну и ту же задачу.
+    """
+    now = timezone.now()
+    Task.objects.filter(
+        status=Task.RUNNING, locked_until__lt=now,
+        attempts__gte=F("max_attempts"),
+    ).update(status=Task.FAILED, locked_until=None,
+             last_error="Истекло время выполнения")
+    candidates = _claimable(now).order_by(
+        "-priority", "run_after", "id"
+    ).values_list("pk", flat=True)[:limit]
+    claimed = [
+        pk for pk in list(candidates)
+        if _claimable(now).filter(pk=pk).update(
+            status=Task.RUNNING,
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            attempts=F("attempts") + 1,
+        )
+    ]
+    return list(Task.objects.filter(pk__in=claimed).order_by(
+        "-priority", "run_after", "id"
+    ))
+
+
+def finish(task, error):
+    # Число попыток отличает этот захват от повторного: после таймаута
+    # задачу мог забрать другой воркер, и её судьбу решает он.
+    tasks = Task.objects.filter(pk=task.pk, status=Task.RUNNING,
+                                attempts=task.attempts)
+    if error is None:
+        # Выполненные задачи удаляются вместе с аргументами.
+        tasks.delete()
+    elif task.attempts >= task.max_attempts:
+        tasks.update(status=Task.FAILED, locked_until=None, last_error=error)
+    else:
+        tasks.update(
+            status=Task.QUEUED, locked_until=None, last_error=error,
+            run_after=timezone.now() + timedelta(seconds=2 ** task.attempts),
+        )
+
+
+def get_pool(workers):
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=child.setup,
+    )
+
+
+def run_batch(pool, limit, visibility_timeout):
+    """Выполняет одну пачку задач; при pool=None - в текущем процессе."""
+    tasks = claim(limit, visibility_timeout)
+    if pool is None:
+        for task in tasks:
+            finish(task, child.execute(task.pk))
+        return len(tasks)
+    futures = {pool.submit(child.execute, task.pk): task for task in tasks}
+    for future in as_completed(futures):
+        finish(futures[future], future.result())
+    return len(tasks)
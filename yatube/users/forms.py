@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+from django.contrib.sites.shortcuts import get_current_site
 
 User = get_user_model()
 
@@ -8,3 +10,19 @@ class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ("first_name", "last_name", "username", "email")
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    def save(self, domain_override=None, use_https=False, request=None,
+             **kwargs):
+        if not settings.BACKGROUND_TASKS:
+            return super().save(domain_override=domain_override,
+                                use_https=use_https, request=request,
+                                **kwargs)
+        from .tasks import send_password_reset
+
+        # В очередь попадают только адрес и домен: задачи видны в админке,
+        # а ссылка сброса даёт доступ к аккаунту.
+        domain = domain_override or get_current_site(request).domain
+        send_password_reset.delay(self.cleaned_data["email"], domain,
+                                  use_https)
@@ -0,0 +1,11 @@
+from django.contrib.auth.forms import PasswordResetForm
+
+from tasks.registry import task
+
+
+@task(priority=20, max_attempts=5)
+def send_password_reset(email, domain, use_https):
+    # Ссылка с токеном собирается только здесь и в базу не попадает.
+    form = PasswordResetForm({"email": email})
+    if form.is_valid():
+        form.save(domain_override=domain, use_https=use_https)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -39,14 +40,51 @@ PAGE_LIMIT = 15
 # Application definition
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache.InstrumentedLocMemCache',
+    },
+    # Версии ключей (posts.cache_versions) должны быть общими для всех
+    # процессов: сброс в одном процессе обязан погасить фрагменты в других.
+    # Файловый кеш общий для процессов одной машины; для нескольких машин
+    # нужен Memcached или Redis.
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'yatube-versions'),
+        'TIMEOUT': None,
+    },
 }
+# Фрагменты страниц сбрасываются сигналами через версии ключей,
+# поэтому время жизни может быть большим.
+FRAGMENT_CACHE_TTL = 60 * 60 * 24
+# Целые страницы для анонимов; 0 - кеш страниц выключен.
+PAGE_CACHE_TTL = 60 * 10
+PAGE_CACHE_VIEWS = (
+    "posts:index",
+    "posts:popular",
+    "posts:group_index",
+    "posts:group_list",
+    "posts:profile",
+    "posts:post_detail",
+    "posts:index_rss",
+    "posts:index_atom",
+    "posts:group_rss",
+    "posts:group_atom",
+    "posts:profile_rss",
+    "posts:profile_atom",
+)
+
+# Превью картинок постов готовятся при загрузке в пуле процессов;
+# при THUMBNAIL_WORKERS = 0 - прямо в запросе после коммита.
+THUMBNAIL_WORKERS = 2
+POST_IMAGE_SIZES = ((480, 170), (960, 339), (1920, 678))
+POST_IMAGE_DEFAULT_WIDTH = 960
+POST_IMAGE_FORMATS = ("webp", "jpeg")
 INSTALLED_APPS = [
     "about.apps.AboutConfig",
     "core.apps.CoreConfig",
     "users.apps.UsersConfig",
     "posts.apps.PostsConfig",
+    "api.apps.ApiConfig",
+    "tasks.apps.TasksConfig",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
@@ -59,6 +97,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'debug_toolbar.middleware.DebugToolbarMiddleware',
+    "core.middleware.ServerTimingMiddleware",
+    "posts.middleware.PageCacheMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -74,13 +114,29 @@ INTERNAL_IPS = [
     '127.0.0.1',
 ]
 
+# Заголовок Server-Timing с временем SQL, шаблонов и обращениями к кешу.
+SERVER_TIMING = True
+# Доля запросов, метрики которых пишутся в лог yatube.profiling.
+PROFILING_SAMPLE_RATE = 0.0
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "yatube.profiling": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 
 EMPTY_VALUE_DISPLAY = "-пусто-"
 ROOT_URLCONF = "yatube.urls"
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "core.templates.TimedDjangoTemplates",
         "DIRS": [TEMPLATES_DIR],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -90,6 +146,7 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "core.context_processors.year.year",
+                "core.context_processors.cache.fragment_ttl",
             ],
         },
     },
@@ -101,12 +158,32 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# core.backends.sqlite3 открывает транзакции atomic() как BEGIN IMMEDIATE,
+# чтобы запись после чтения ждала блокировку, а не падала сразу.
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "core.backends.sqlite3",
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
+        "CONN_MAX_AGE": 60,
     }
 }
+# Алиасы из DATABASES, с которых читают ленты; их содержимое - копия
+# default. После записи сессия пользователя закрепляется за default.
+REPLICA_DATABASES = []
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+
+# Применяются к каждому новому соединению с SQLite (core.db).
+# WAL позволяет читать во время записи, busy_timeout - ждать блокировку
+# вместо ошибки "database is locked". Ожидание работает только для
+# транзакций, начатых с BEGIN IMMEDIATE (см. core.backends.sqlite3).
+# Пустой словарь - настройки SQLite по умолчанию.
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -20000,
+    "busy_timeout": 5000,
+}
 
 
 # Password validation
@@ -132,6 +209,46 @@ LOGIN_REDIRECT_URL = "posts:index"
 PASSWORD_CHANGE_URL = "users:password_change"
 
 POST_LIMIT = 10
+COMMENT_LIMIT = 20
+# Комментарии пишутся в локальную очередь и сохраняются пачками командой
+# flush_comments; автор видит свой комментарий сразу из сессии.
+COMMENT_WRITE_BEHIND = False
+COMMENT_SPOOL_PATH = os.path.join(BASE_DIR, "spool", "comments.jsonl")
+COMMENT_FLUSH_BATCH = 500
+# Записей в RSS/Atom-лентах и время кеширования лент и карты сайта
+# у клиентов и прокси, секунд.
+FEED_ITEMS = 20
+FEED_MAX_AGE = 600
+# Постов в одной части sitemap.xml (не больше 50000 по протоколу) и строк,
+# которые читаются из базы и отдаются клиенту за раз.
+SITEMAP_SHARD_SIZE = 10000
+SITEMAP_CHUNK = 500
+# Период полураспада веса комментария в рейтинге популярных постов, секунд.
+HOT_HALF_LIFE = 6 * 60 * 60
+HOT_BATCH = 500
+# Превью и письма ставятся в очередь задач в базе и выполняются командой
+# run_tasks в пуле процессов; при False всё делается как раньше.
+BACKGROUND_TASKS = False
+TASK_WORKERS = 2
+# Через сколько секунд задачу зависшего воркера можно забрать снова.
+TASK_VISIBILITY_TIMEOUT = 300
+# "page" - классическая пагинация по номерам страниц,
+# "cursor" - keyset-пагинация по (pub_date, id) без COUNT и OFFSET.
+PAGINATION_MODE = "page"
+PAGINATOR_EXACT_COUNT = False
+# Сколько последних постов хранится в ленте подписок каждого пользователя.
+TIMELINE_LIMIT = 1000
+TIMELINE_BATCH_SIZE = 500
+# Потоки для независимых запросов profile и post_detail;
+# 0 - запросы выполняются последовательно. Имеет смысл для сетевой СУБД:
+# с SQLite выигрыша нет (см. manage.py bench_concurrency).
+VIEW_QUERY_WORKERS = 0
+# Граф подписок в памяти процесса перечитывается из базы раз в TTL секунд,
+# чтобы подхватить изменения, сделанные другими процессами.
+FOLLOW_GRAPH_TTL = 300
+FOLLOW_SUGGESTIONS = 5
+# Сколько подписок читателя просматривается при подборе рекомендаций.
+FOLLOW_SUGGESTIONS_FANOUT = 200
 
 
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"